@@ -0,0 +1,99 @@
+"""Recall@k and query latency of the approximate index types against the flat index.
+
+    islamqa index benchmark --index-path vectorDB --k 5
+    islamqa index benchmark --types ivf_flat hnsw --param nprobe=32 --param efSearch=128
+"""
+import json
+import time
+import argparse
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from langchain_community.embeddings import HuggingFaceEmbeddings
+
+from .ann_index import INDEX_TYPES, DEFAULT_PARAMS, build_ann_index, set_search_params
+from .docstore import load_faiss
+from .generation import read_records, record_question
+from .retrieval import embed_questions
+
+
+def query_vectors(vector_db, questions_file: str, limit: int) -> np.ndarray:
+    questions = [q for q in (record_question(data) for _, data in read_records(questions_file, limit)) if q]
+    return embed_questions(vector_db, questions)
+
+
+def timed_search(index, vectors: np.ndarray, k: int):
+    """Search one query at a time, as the generation scripts do, recording each latency."""
+    ids, latencies = [], []
+    for row in vectors:
+        start = time.perf_counter()
+        _, found = index.search(row.reshape(1, -1), k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        ids.append(found[0])
+    return np.vstack(ids), np.asarray(latencies)
+
+
+def recall_at_k(truth: np.ndarray, found: np.ndarray) -> float:
+    hits = [len(set(t[t >= 0]) & set(f[f >= 0])) / max(1, (t >= 0).sum()) for t, f in zip(truth, found)]
+    return float(np.mean(hits))
+
+
+def parse_params(pairs: List[str]) -> Dict[str, Any]:
+    params = {}
+    for pair in pairs:
+        key, value = pair.split("=", 1)
+        params[key] = int(value)
+    return params
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--index-path", default="vectorDB")
+    parser.add_argument("--embedder", default="sentence-transformers/all-mpnet-base-v2")
+    parser.add_argument("--questions", default="test.jsonl")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--types", nargs="+", default=[t for t in INDEX_TYPES if t != "flat"], choices=INDEX_TYPES)
+    parser.add_argument("--param", action="append", default=[], help="override an index parameter, e.g. nprobe=32")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    embeddings = HuggingFaceEmbeddings(model_name=args.embedder)
+    vector_db = load_faiss(args.index_path, embeddings)
+    flat = vector_db.index
+    vectors = query_vectors(vector_db, args.questions, args.limit)
+    truth, flat_latencies = timed_search(flat, vectors, args.k)
+    overrides = parse_params(args.param)
+
+    results = [{
+        "index_type": "flat", "params": {}, "build_s": 0.0, f"recall@{args.k}": 1.0,
+        "p50_ms": float(np.percentile(flat_latencies, 50)), "p99_ms": float(np.percentile(flat_latencies, 99)),
+    }]
+    for index_type in args.types:
+        if index_type == "flat":
+            continue
+        params = dict(DEFAULT_PARAMS[index_type], **{k: v for k, v in overrides.items() if k in DEFAULT_PARAMS[index_type]})
+        start = time.perf_counter()
+        index, params = build_ann_index(flat, index_type, params)
+        build_s = time.perf_counter() - start
+        set_search_params(index, params)
+        found, latencies = timed_search(index, vectors, args.k)
+        results.append({
+            "index_type": index_type, "params": params, "build_s": build_s,
+            f"recall@{args.k}": recall_at_k(truth, found),
+            "p50_ms": float(np.percentile(latencies, 50)), "p99_ms": float(np.percentile(latencies, 99)),
+        })
+
+    print(f"\n{flat.ntotal} vectors, {len(vectors)} queries, k={args.k}")
+    print(f"{'index':<10} {'build s':>8} {'recall':>7} {'p50 ms':>8} {'p99 ms':>8}  params")
+    for r in results:
+        print(f"{r['index_type']:<10} {r['build_s']:>8.2f} {r[f'recall@{args.k}']:>7.3f} "
+              f"{r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f}  {r['params']}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import os
+import json
+import math
+from typing import Dict, Any, Optional
+
+import faiss
+from langchain_community.vectorstores import FAISS
+
+from .docstore import INDEX_FILE, MMAP_FLAGS, load_faiss
+
+# "flat", "ivf_flat", "ivf_pq" or "hnsw"; None keeps whatever is stored with the index.
+INDEX_TYPE = os.getenv("INDEX_TYPE") or None
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+ANN_INDEX_FILE = "index.ann.faiss"
+INDEX_CONFIG_FILE = "index_config.json"
+
+DEFAULT_PARAMS = {
+    "flat": {},
+    "ivf_flat": {"nlist": 1024, "nprobe": 16},
+    "ivf_pq": {"nlist": 1024, "nprobe": 16, "m": 64, "nbits": 8},
+    "hnsw": {"M": 32, "efConstruction": 200, "efSearch": 64},
+}
+# Below 16 centroids per sub-quantizer PQ is too coarse to be worth it; small corpora get IVF-Flat.
+MIN_PQ_BITS = 4
+# Search-time parameters can change on load without rebuilding the index.
+SEARCH_PARAMS = {"nprobe", "efSearch"}
+
+
+def _build_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in params.items() if k not in SEARCH_PARAMS}
+
+
+def build_ann_index(flat_index, index_type: str, params: Dict[str, Any]):
+    """Build and train an approximate index holding the same vectors, in the same order, as `flat_index`.
+
+    IVF parameters shrink to what the corpus can train; the returned params are the ones actually used.
+    """
+    vectors = flat_index.reconstruct_n(0, flat_index.ntotal)
+    dim = flat_index.d
+    metric = flat_index.metric_type
+
+    if index_type in ("ivf_flat", "ivf_pq"):
+        # FAISS wants ~39 training points per list; shrink nlist for small corpora.
+        nlist = max(1, min(params["nlist"], flat_index.ntotal // 39))
+        quantizer = faiss.IndexFlatIP(dim) if metric == faiss.METRIC_INNER_PRODUCT else faiss.IndexFlatL2(dim)
+        params = dict(params, nlist=nlist)
+        if index_type == "ivf_pq":
+            # Each PQ codebook has 2**nbits centroids and needs at least that many training vectors.
+            params["nbits"] = min(params["nbits"], int(math.log2(max(1, flat_index.ntotal))))
+            if params["nbits"] < MIN_PQ_BITS:
+                print(f"Only {flat_index.ntotal} vectors; building IVF-Flat instead of IVF-PQ")
+                index_type = "ivf_flat"
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, metric)
+        else:
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, params["m"], params["nbits"], metric)
+        index.train(vectors)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, params["M"], metric)
+        index.hnsw.efConstruction = params["efConstruction"]
+    else:
+        raise ValueError(f"Unknown index type: {index_type} (expected one of {', '.join(INDEX_TYPES)})")
+
+    index.add(vectors)
+    return index, params
+
+
+def set_search_params(index, params: Dict[str, Any]):
+    if "nprobe" in params and hasattr(index, "nprobe"):
+        index.nprobe = params["nprobe"]
+    if "efSearch" in params and hasattr(index, "hnsw"):
+        index.hnsw.efSearch = params["efSearch"]
+
+
+def load_index_config(index_path: str) -> Optional[Dict[str, Any]]:
+    config_path = os.path.join(index_path, INDEX_CONFIG_FILE)
+    if not os.path.exists(config_path):
+        return None
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def use_index_type(vector_db: FAISS, index_path: str, index_type: Optional[str] = INDEX_TYPE,
+                   index_params: Optional[Dict[str, Any]] = None) -> FAISS:
+    """Swap the flat index of a loaded store for the configured approximate index.
+
+    The flat `index.faiss` stays the source of truth for updates; the
+    approximate index is stored next to it with its type and parameters, and
+    is rebuilt when those change or the flat index has been rewritten.
+    """
+    stored = load_index_config(index_path)
+    index_type = index_type or (stored or {}).get("index_type") or "flat"
+    if index_type == "flat":
+        return vector_db
+
+    params = dict(DEFAULT_PARAMS[index_type])
+    if stored is not None and stored["index_type"] == index_type:
+        params.update(stored["build_params"])
+        params.update({k: v for k, v in stored["params"].items() if k in SEARCH_PARAMS})
+    params.update(index_params or {})
+    flat_mtime = os.path.getmtime(os.path.join(index_path, INDEX_FILE))
+    ann_path = os.path.join(index_path, ANN_INDEX_FILE)
+    reusable = (
+        stored is not None
+        and stored["index_type"] == index_type
+        and stored["flat_mtime"] == flat_mtime
+        and stored["build_params"] == _build_params(params)
+        and os.path.exists(ann_path)
+    )
+
+    if reusable:
+        index = faiss.read_index(ann_path, MMAP_FLAGS)
+        params = dict(stored["params"], **{k: v for k, v in params.items() if k in SEARCH_PARAMS})
+    else:
+        print(f"Building {index_type} index over {vector_db.index.ntotal} vectors...")
+        build_params = _build_params(params)
+        index, params = build_ann_index(vector_db.index, index_type, params)
+        faiss.write_index(index, ann_path)
+        with open(os.path.join(index_path, INDEX_CONFIG_FILE), 'w', encoding='utf-8') as f:
+            json.dump({"index_type": index_type, "build_params": build_params,
+                       "params": params, "flat_mtime": flat_mtime}, f)
+
+    set_search_params(index, params)
+    vector_db.index = index
+    return vector_db
+
+
+def load_vector_db(index_path, embeddings_model, index_type: Optional[str] = INDEX_TYPE,
+                   index_params: Optional[Dict[str, Any]] = None) -> FAISS:
+    vector_db = load_faiss(index_path, embeddings_model)
+    return use_index_type(vector_db, str(index_path), index_type, index_params)
@@ -0,0 +1,192 @@
+"""islamqa command line.
+
+    islamqa generate --model llama-4-rag
+    islamqa experiment experiments/rag_merged_db.json
+    islamqa serve --model gemini-rag --port 8080
+    islamqa index build --update
+    islamqa eval "gemini(rag).jsonl" phi_rag.jsonl
+
+Only argparse is imported up front; each subcommand imports what it needs when it runs.
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+
+def _generate(args) -> int:
+    from dotenv import load_dotenv
+    from .models import get_model
+    from .pipeline import run_model
+
+    load_dotenv()
+    config = get_model(args.model)
+    written = run_model(config, args.input, args.output, args.limit or None, args.index_path, args.k,
+                        args.concurrency, args.resume)
+    print(f"\nDone! {written} answers saved to {args.output or config['output']}")
+    return 0
+
+
+def _experiment(args) -> int:
+    from dotenv import load_dotenv
+    from .experiment import run_experiment
+
+    load_dotenv()
+    written = run_experiment(args.config, args.limit, args.concurrency, args.resume)
+    for output, count in written.items():
+        print(f"{count} answers saved to {output}")
+    return 0
+
+
+def _index_build(args) -> int:
+    from .index import build_index
+
+    vector_db = build_index(args.index_path, args.force, args.update, args.type)
+    print(f"Index at {args.index_path}: {vector_db.index.ntotal} vectors")
+    return 0
+
+
+def _index_benchmark(args) -> int:
+    from .ann_benchmark import main as benchmark
+
+    benchmark(args.benchmark_args)
+    return 0
+
+
+def _bench(args) -> int:
+    from .retrieval_benchmark import main as benchmark
+
+    benchmark(args.bench_args)
+    return 0
+
+
+def _mock(args) -> int:
+    from .mock_server import main as serve
+
+    serve(args.mock_args)
+    return 0
+
+
+def _serve(args) -> int:
+    from .server import main as serve
+
+    serve(args.serve_args)
+    return 0
+
+
+def _eval(args) -> int:
+    if args.ragas:
+        from .ragas_eval import evaluate_ragas
+        for path in args.files:
+            evaluate_ragas(path, args.references, clean=not args.no_clean)
+        return 0
+
+    from .evaluation import evaluate_files
+    evaluate_files(args.files, args.ref_key, args.gen_key, output=args.output, normalize=args.normalize)
+    return 0
+
+
+def _models(args) -> int:
+    from .models import MODELS
+
+    for name, config in MODELS.items():
+        rag = f"RAG over {config['index_path']}" if config.get("index_path") else "no retrieval"
+        print(f"{name:<18} {config['provider']:<12} {config['model']:<48} {rag}")
+    return 0
+
+
+def _keys(args) -> int:
+    from dotenv import load_dotenv
+    from .models import get_model
+    from .providers import check_keys
+
+    load_dotenv()
+    return 1 if check_keys(get_model(args.model)) else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from .models import LOCAL_DB_PATH
+
+    parser = argparse.ArgumentParser(prog="islamqa", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="answer test questions with one model")
+    generate.add_argument("--model", required=True, help="model name, see `islamqa models`")
+    generate.add_argument("--input", default="test.jsonl")
+    generate.add_argument("--output", help="defaults to the model's configured output file")
+    generate.add_argument("--limit", type=int, default=100, help="number of questions, 0 for all")
+    generate.add_argument("--index-path", help="override the model's FAISS index")
+    generate.add_argument("--k", type=int, help="override the number of retrieved chunks")
+    generate.add_argument("--concurrency", type=int)
+    generate.add_argument("--resume", action="store_true", help="skip questions already in the output file")
+    generate.set_defaults(handler=_generate)
+
+    experiment = commands.add_parser("experiment", help="retrieve once and answer with every model in a config file")
+    experiment.add_argument("config", help="experiment JSON, e.g. experiments/rag_merged_db.json")
+    experiment.add_argument("--limit", type=int, help="number of questions (default: the file's limit)")
+    experiment.add_argument("--concurrency", type=int, help="questions in flight")
+    experiment.add_argument("--resume", action="store_true", help="skip questions already in each output file")
+    experiment.set_defaults(handler=_experiment)
+
+    index = commands.add_parser("index", help="build or benchmark the vector index")
+    index_commands = index.add_subparsers(dest="index_command", required=True)
+    build = index_commands.add_parser("build", help="build or update the index from the source CSVs")
+    build.add_argument("--index-path", default=LOCAL_DB_PATH)
+    build.add_argument("--force", action="store_true", help="rebuild from scratch")
+    build.add_argument("--update", action="store_true", help="embed only new or changed chunks")
+    build.add_argument("--type", help="flat, ivf_flat, ivf_pq or hnsw (default: INDEX_TYPE)")
+    build.set_defaults(handler=_index_build)
+    benchmark = index_commands.add_parser("benchmark", help="recall and latency of the ANN index types",
+                                          add_help=False)
+    benchmark.add_argument("benchmark_args", nargs=argparse.REMAINDER)
+    benchmark.set_defaults(handler=_index_benchmark)
+
+    bench = commands.add_parser("bench", help="offline retrieval benchmark over labeled questions", add_help=False)
+    bench.add_argument("bench_args", nargs=argparse.REMAINDER)
+    bench.set_defaults(handler=_bench)
+
+    mock = commands.add_parser("mock", help="local stand-in for the provider APIs, for load tests", add_help=False)
+    mock.add_argument("mock_args", nargs=argparse.REMAINDER)
+    mock.set_defaults(handler=_mock)
+
+    serve = commands.add_parser("serve", help="HTTP service answering questions from the warm index",
+                                add_help=False)
+    serve.add_argument("serve_args", nargs=argparse.REMAINDER)
+    serve.set_defaults(handler=_serve)
+
+    evaluate = commands.add_parser("eval", help="score model output files")
+    evaluate.add_argument("files", nargs="+")
+    evaluate.add_argument("--ref-key", default="Reference_Answer")
+    evaluate.add_argument("--gen-key", default="Generated_Answer")
+    evaluate.add_argument("--output", help="write each file's mean scores to this JSON file")
+    evaluate.add_argument("--normalize", action="store_true", help="lowercase and strip punctuation before scoring")
+    evaluate.add_argument("--ragas", action="store_true", help="RAGAS metrics instead of BERTScore/ROUGE")
+    evaluate.add_argument("--references", help="RAGAS: take questions and answers from this test file")
+    evaluate.add_argument("--no-clean", action="store_true", help="RAGAS: skip text cleaning")
+    evaluate.set_defaults(handler=_eval)
+
+    models = commands.add_parser("models", help="list the configured models")
+    models.set_defaults(handler=_models)
+
+    keys = commands.add_parser("keys", help="check every API key configured for a model")
+    keys.add_argument("model")
+    keys.set_defaults(handler=_keys)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # The benchmarks parse their own options, which argparse.REMAINDER drops when the first one starts with "--".
+    if argv[:1] == ["bench"]:
+        return _bench(argparse.Namespace(bench_args=argv[1:]))
+    if argv[:1] == ["mock"]:
+        return _mock(argparse.Namespace(mock_args=argv[1:]))
+    if argv[:1] == ["serve"]:
+        return _serve(argparse.Namespace(serve_args=argv[1:]))
+    if argv[:2] == ["index", "benchmark"]:
+        return _index_benchmark(argparse.Namespace(benchmark_args=argv[2:]))
+    args = build_parser().parse_args(argv)
+    if args.command == "index" and args.index_command == "build" and args.type is None:
+        from .ann_index import INDEX_TYPE
+        args.type = INDEX_TYPE
+    return args.handler(args)
@@ -0,0 +1,184 @@
+import os
+import re
+import atexit
+import threading
+from typing import List, Dict, Optional, Tuple
+
+from langchain_core.documents import Document
+
+# Context tokens per request, by model. CONTEXT_TOKEN_BUDGET overrides all of them.
+MODEL_BUDGETS = {
+    "mixtral-8x7b-32768": 3000,
+    "meta-llama/llama-4-maverick-17b-128e-instruct": 1500,
+    "deepseek-r1-distill-llama-70b": 1500,
+    "microsoft/Phi-4-reasoning": 2000,
+    "gemini-2.5-flash": 4000,
+    "mistralai/Mistral-7B-Instruct-v0.1": 1500,
+}
+DEFAULT_BUDGET = 2000
+BUDGET_OVERRIDE = int(os.getenv("CONTEXT_TOKEN_BUDGET", "0")) or None
+
+# Hugging Face tokenizer per model; models without one (or when it can't be loaded) fall back to ~4 chars/token.
+MODEL_TOKENIZERS = {
+    "mixtral-8x7b-32768": "mistralai/Mixtral-8x7B-Instruct-v0.1",
+    "meta-llama/llama-4-maverick-17b-128e-instruct": "meta-llama/Llama-4-Maverick-17B-128E-Instruct",
+    "deepseek-r1-distill-llama-70b": "deepseek-ai/DeepSeek-R1-Distill-Llama-70B",
+    "microsoft/Phi-4-reasoning": "microsoft/Phi-4-reasoning",
+    "mistralai/Mistral-7B-Instruct-v0.1": "mistralai/Mistral-7B-Instruct-v0.1",
+}
+
+MIN_OVERLAP = 20
+MAX_OVERLAP = 400
+SEPARATOR = "\n\n"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class Tokenizer:
+    """Token counting and truncation with a Hugging Face tokenizer, or ~4 characters per token without one."""
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+        self.tokenizer = None
+        if name:
+            try:
+                from transformers import AutoTokenizer
+                self.tokenizer = AutoTokenizer.from_pretrained(name)
+            except Exception as e:
+                print(f"Could not load tokenizer {name} ({e}); estimating 4 characters per token.")
+
+    def count(self, text: str) -> int:
+        if self.tokenizer is None:
+            return (len(text) + 3) // 4
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if self.tokenizer is None:
+            return text[:max_tokens * 4]
+        ids = self.tokenizer.encode(text, add_special_tokens=False)[:max_tokens]
+        return self.tokenizer.decode(ids)
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def _overlap(first: str, second: str) -> int:
+    """Length of the longest suffix of `first` that is also a prefix of `second`."""
+    for n in range(min(len(first), len(second), MAX_OVERLAP), MIN_OVERLAP - 1, -1):
+        if first.endswith(second[:n]):
+            return n
+    return 0
+
+
+def _merge_pair(a: str, b: str) -> Optional[str]:
+    if b in a:
+        return a
+    if a in b:
+        return b
+    for first, second in ((a, b), (b, a)):
+        n = _overlap(first, second)
+        if n:
+            return first + second[n:]
+    return None
+
+
+def merge_chunks(docs: List[Document]) -> List[Tuple[int, str]]:
+    """Merge chunks of the same CSV row that overlap, and drop duplicate passages.
+
+    Returns (rank, text) pairs in rank order, where a merged passage takes the
+    best retrieval rank of the chunks it was built from.
+    """
+    groups: Dict[object, List[Tuple[int, str]]] = {}
+    for rank, doc in enumerate(docs):
+        row = doc.metadata.get("row")
+        key = (doc.metadata.get("original_file") or doc.metadata.get("source"), row) if row is not None else rank
+        groups.setdefault(key, []).append((rank, doc.page_content.strip()))
+
+    passages = []
+    for pieces in groups.values():
+        merged = True
+        while merged and len(pieces) > 1:
+            merged = False
+            for i in range(len(pieces)):
+                for j in range(i + 1, len(pieces)):
+                    text = _merge_pair(pieces[i][1], pieces[j][1])
+                    if text is not None:
+                        pieces[i] = (min(pieces[i][0], pieces[j][0]), text)
+                        del pieces[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+        passages.extend(pieces)
+    passages.sort()
+
+    # The same passage can come from different files or rows (e.g. a hadith present in two collections).
+    kept: List[Tuple[int, str]] = []
+    seen: List[str] = []
+    for rank, text in passages:
+        norm = _normalize(text)
+        if not norm or any(norm in other for other in seen):
+            continue
+        kept = [(r, t) for (r, t), other in zip(kept, seen) if other not in norm]
+        seen = [other for other in seen if other not in norm]
+        kept.append((rank, text))
+        seen.append(norm)
+    kept.sort()
+    return kept
+
+
+class ContextPacker:
+    """Builds the prompt context for one model from retrieved documents.
+
+    Overlapping chunks are merged and duplicates dropped, then passages are
+    added best-first until the model's token budget is used up. Token counts
+    before and after packing are tallied and printed at exit.
+    """
+
+    def __init__(self, model: str, budget: Optional[int] = None, tokenizer: Optional[Tokenizer] = None):
+        self.model = model
+        self.budget = budget or BUDGET_OVERRIDE or MODEL_BUDGETS.get(model, DEFAULT_BUDGET)
+        self.tokenizer = tokenizer or Tokenizer(MODEL_TOKENIZERS.get(model))
+        self.separator_tokens = self.tokenizer.count(SEPARATOR)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.raw_tokens = 0
+        self.packed_tokens = 0
+        atexit.register(self._print_stats)
+
+    def pack(self, docs: List[Document]) -> str:
+        parts, used = [], 0
+        for _, text in merge_chunks(docs):
+            tokens = self.tokenizer.count(text) + (self.separator_tokens if parts else 0)
+            if used + tokens <= self.budget:
+                parts.append(text)
+                used += tokens
+            elif not parts:
+                # Never send an empty context just because the best passage is too long.
+                parts.append(self.tokenizer.truncate(text, self.budget))
+                used = self.budget
+        context = SEPARATOR.join(parts)
+
+        raw = sum(self.tokenizer.count(doc.page_content) for doc in docs)
+        with self.lock:
+            self.requests += 1
+            self.raw_tokens += raw
+            self.packed_tokens += self.tokenizer.count(context)
+        return context
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "raw_tokens": self.raw_tokens,
+                "packed_tokens": self.packed_tokens,
+                "saved": 1 - self.packed_tokens / self.raw_tokens if self.raw_tokens else 0.0,
+            }
+
+    def _print_stats(self):
+        stats = self.stats()
+        if stats["requests"]:
+            print(f"Context packing ({self.model}): {stats['raw_tokens'] / stats['requests']:.0f} -> "
+                  f"{stats['packed_tokens'] / stats['requests']:.0f} tokens per request "
+                  f"({stats['saved']:.0%} saved, budget {self.budget})")
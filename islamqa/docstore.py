@@ -0,0 +1,152 @@
+import os
+import json
+import sqlite3
+import threading
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Union
+
+import faiss
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+DOCSTORE_FILE = "docstore.sqlite"
+INDEX_FILE = "index.faiss"
+PICKLE_FILE = "index.pkl"
+# Index data is paged in from disk on demand. Newer FAISS maps flat codes with IO_FLAG_MMAP_IFC;
+# it cannot be combined with IO_FLAG_MMAP, which makes IVF indexes fail to load.
+MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+class SqliteDocstore(Docstore, AddableMixin):
+    """Chunk texts and metadata in SQLite, read one id at a time as FAISS returns them.
+
+    The table also stores FAISS row positions, so `index_to_docstore_id` is a
+    lazy view (`SqliteIdMap`) instead of a dict built at load time.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs (id TEXT PRIMARY KEY, page_content TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS positions (pos INTEGER PRIMARY KEY, id TEXT NOT NULL)")
+        self.conn.commit()
+
+    def search(self, search: str) -> Union[str, Document]:
+        with self.lock:
+            row = self.conn.execute("SELECT page_content, metadata FROM docs WHERE id = ?", (search,)).fetchone()
+        if row is None:
+            return f"ID {search} not found."
+        return Document(id=search, page_content=row[0], metadata=json.loads(row[1]))
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO docs VALUES (?, ?, ?)",
+                [(doc_id, doc.page_content, json.dumps(doc.metadata, ensure_ascii=False, default=str))
+                 for doc_id, doc in texts.items()],
+            )
+            self.conn.commit()
+
+    def delete(self, ids: List) -> None:
+        with self.lock:
+            self.conn.executemany("DELETE FROM docs WHERE id = ?", [(doc_id,) for doc_id in ids])
+            self.conn.commit()
+
+    def write_positions(self, index_to_docstore_id: Mapping):
+        with self.lock:
+            self.conn.execute("DELETE FROM positions")
+            self.conn.executemany("INSERT INTO positions VALUES (?, ?)", list(index_to_docstore_id.items()))
+            self.conn.commit()
+
+    def id_at(self, pos: int) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute("SELECT id FROM positions WHERE pos = ?", (int(pos),)).fetchone()
+        return row[0] if row else None
+
+    def position_count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def iter_positions(self) -> Iterable:
+        with self.lock:
+            rows = self.conn.execute("SELECT pos, id FROM positions ORDER BY pos").fetchall()
+        return iter(rows)
+
+
+class SqliteIdMap(Mapping):
+    """Read-only FAISS position -> docstore id view over `SqliteDocstore.positions`."""
+
+    def __init__(self, docstore: SqliteDocstore):
+        self.docstore = docstore
+
+    def __getitem__(self, pos):
+        doc_id = self.docstore.id_at(pos)
+        if doc_id is None:
+            raise KeyError(pos)
+        return doc_id
+
+    def __len__(self):
+        return self.docstore.position_count()
+
+    def __iter__(self):
+        return (pos for pos, _ in self.docstore.iter_positions())
+
+    def items(self):
+        return list(self.docstore.iter_positions())
+
+    def update(self, other):
+        # FAISS.add_* calls this; the positions are written out on save.
+        raise TypeError("Load the vector store with mmap=False to modify it.")
+
+
+def save_vector_db(vector_db: FAISS, index_path: str):
+    """Write the FAISS index and an SQLite docstore; nothing is pickled."""
+    os.makedirs(index_path, exist_ok=True)
+    faiss.write_index(vector_db.index, os.path.join(index_path, INDEX_FILE))
+    docstore_path = os.path.join(index_path, DOCSTORE_FILE)
+
+    docstore = vector_db.docstore
+    in_place = (isinstance(docstore, SqliteDocstore) and os.path.exists(docstore_path)
+                and os.path.samefile(docstore.path, docstore_path))
+    if not in_place:
+        if os.path.exists(docstore_path):
+            os.remove(docstore_path)
+        target = SqliteDocstore(docstore_path)
+        ids = list(vector_db.index_to_docstore_id.values())
+        for start in range(0, len(ids), 1000):
+            batch = ids[start:start + 1000]
+            target.add({doc_id: docstore.search(doc_id) for doc_id in batch})
+        docstore = target
+    docstore.write_positions(dict(vector_db.index_to_docstore_id.items()))
+
+    pickle_path = os.path.join(index_path, PICKLE_FILE)
+    if os.path.exists(pickle_path):
+        os.remove(pickle_path)
+
+
+def load_faiss(index_path, embeddings_model, mmap: bool = True) -> FAISS:
+    """Load a vector store saved by `save_vector_db`.
+
+    With `mmap` the index is memory-mapped read-only and docstore rows are only
+    read for the ids a search returns. Pass mmap=False to modify the store.
+    A store still in LangChain's pickle format is converted once.
+    """
+    index_path = str(index_path)
+    docstore_path = os.path.join(index_path, DOCSTORE_FILE)
+    if not os.path.exists(docstore_path) and os.path.exists(os.path.join(index_path, PICKLE_FILE)):
+        print(f"Converting the pickled docstore in {index_path} to {DOCSTORE_FILE} (one-time)...")
+        save_vector_db(FAISS.load_local(index_path, embeddings_model, allow_dangerous_deserialization=True),
+                       index_path)
+
+    docstore = SqliteDocstore(docstore_path)
+    if mmap:
+        index = faiss.read_index(os.path.join(index_path, INDEX_FILE), MMAP_FLAGS)
+        index_to_docstore_id = SqliteIdMap(docstore)
+    else:
+        index = faiss.read_index(os.path.join(index_path, INDEX_FILE))
+        index_to_docstore_id = dict(docstore.iter_positions())
+    return FAISS(embeddings_model, index, docstore, index_to_docstore_id)
@@ -0,0 +1,182 @@
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .llm_cache import ResponseCache, cache_key
+from .normalize import normalize_many
+
+# Same model bert_score picks for lang="en"; a local path also needs BERTSCORE_LAYERS.
+BERTSCORE_MODEL = os.getenv("BERTSCORE_MODEL", "roberta-large")
+BERTSCORE_LAYERS = int(os.getenv("BERTSCORE_LAYERS", "0")) or None
+EVAL_CACHE_PATH = os.getenv("EVAL_CACHE_PATH", ".eval_cache.sqlite")
+EVAL_WORKERS = int(os.getenv("EVAL_WORKERS", "0")) or os.cpu_count() or 1
+
+ROUGE_TYPES = ("rouge1", "rouge2", "rougeL")
+# Pairs per BERTScore call; pairs are sorted by length first so each call pads little.
+BUCKET_PAIRS = 256
+
+_rouge = None
+
+
+def load_pairs(file_path: str, ref_key: str, gen_key: str, normalize: bool = False) -> (List[str], List[str]):
+    references, candidates = [], []
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            data = json.loads(line)
+            ref = data.get(ref_key)
+            gen = data.get(gen_key)
+            if ref and gen:
+                references.append(ref.strip())
+                candidates.append(gen.strip())
+    if normalize:
+        # The same cleaning the RAGAS evaluation applies, for scores that ignore case and punctuation.
+        references, candidates = normalize_many(references), normalize_many(candidates)
+    return references, candidates
+
+
+def _rouge_chunk(pairs: List[Tuple[str, str]]) -> List[List[float]]:
+    global _rouge
+    if _rouge is None:
+        from rouge_score import rouge_scorer
+        _rouge = rouge_scorer.RougeScorer(list(ROUGE_TYPES), use_stemmer=True)
+    results = []
+    for ref, gen in pairs:
+        scores = _rouge.score(ref, gen)
+        results.append([scores[name].fmeasure for name in ROUGE_TYPES])
+    return results
+
+
+class ScoreEngine:
+    """BERTScore and ROUGE for (reference, candidate) pairs, with every pair's scores cached on disk.
+
+    The BERTScore model is loaded once, on the first uncached pair, and reused
+    for every file. Uncached pairs are sorted by length and scored in buckets
+    of similar length; ROUGE runs in a process pool. Scores are written to the
+    cache after each bucket, so an interrupted run keeps what it finished.
+    """
+
+    def __init__(self, model_type: str = BERTSCORE_MODEL, num_layers: Optional[int] = BERTSCORE_LAYERS,
+                 batch_size: int = 64, cache_path: str = EVAL_CACHE_PATH, workers: int = EVAL_WORKERS):
+        self.model_type = model_type
+        self.num_layers = num_layers
+        self.batch_size = batch_size
+        self.workers = workers
+        self.cache = ResponseCache(cache_path)
+        self.scorer = None
+
+    def _bert_keys(self, pairs: Sequence[Tuple[str, str]]) -> List[str]:
+        return [cache_key("bertscore", f"{self.model_type}:{self.num_layers}", list(pair), None, None)
+                for pair in pairs]
+
+    def bertscore(self, pairs: Sequence[Tuple[str, str]]) -> List[List[float]]:
+        """[precision, recall, f1] per pair."""
+        keys = self._bert_keys(pairs)
+        cached = self.cache.get_many(keys)
+        missing = sorted({key: i for i, key in enumerate(keys) if key not in cached}.values(),
+                         key=lambda i: len(pairs[i][0]) + len(pairs[i][1]))
+        if missing and self.scorer is None:
+            from bert_score import BERTScorer
+            self.scorer = BERTScorer(model_type=self.model_type, num_layers=self.num_layers,
+                                     lang="en", batch_size=self.batch_size, device="cpu")
+        for start in range(0, len(missing), BUCKET_PAIRS):
+            bucket = missing[start:start + BUCKET_PAIRS]
+            P, R, F1 = self.scorer.score([pairs[i][1] for i in bucket], [pairs[i][0] for i in bucket],
+                                         batch_size=self.batch_size)
+            computed = {keys[i]: json.dumps([p, r, f]) for i, p, r, f in
+                        zip(bucket, P.tolist(), R.tolist(), F1.tolist())}
+            self.cache.set_many(computed)
+            cached.update(computed)
+            print(f"BERTScore: {min(start + BUCKET_PAIRS, len(missing))}/{len(missing)} new pairs scored")
+        return [json.loads(cached[key]) for key in keys]
+
+    def rouge(self, pairs: Sequence[Tuple[str, str]]) -> List[List[float]]:
+        """[rouge1, rouge2, rougeL] F-measure per pair."""
+        keys = [cache_key("rouge", ",".join(ROUGE_TYPES), list(pair), None, None) for pair in pairs]
+        cached = self.cache.get_many(keys)
+        missing = sorted({key: i for i, key in enumerate(keys) if key not in cached}.values(),
+                         key=lambda i: -(len(pairs[i][0]) * len(pairs[i][1])))
+        if missing:
+            # ROUGE-L is quadratic in length, so pairs are dealt round-robin from longest to shortest
+            # to give every chunk a similar amount of work.
+            n_chunks = min(len(missing), self.workers * 4)
+            chunks = [missing[i::n_chunks] for i in range(n_chunks)]
+            if self.workers > 1 and len(chunks) > 1:
+                with ProcessPoolExecutor(self.workers) as pool:
+                    results = list(pool.map(_rouge_chunk, [[pairs[i] for i in chunk] for chunk in chunks]))
+            else:
+                results = [_rouge_chunk([pairs[i] for i in chunk]) for chunk in chunks]
+            computed = {keys[i]: json.dumps(scores) for chunk, chunk_scores in zip(chunks, results)
+                        for i, scores in zip(chunk, chunk_scores)}
+            self.cache.set_many(computed)
+            cached.update(computed)
+        return [json.loads(cached[key]) for key in keys]
+
+    def score(self, references: List[str], candidates: List[str]) -> Dict[str, List[float]]:
+        pairs = list(zip(references, candidates))
+        bert = self.bertscore(pairs)
+        rouge = self.rouge(pairs)
+        scores = {name: [s[i] for s in bert] for i, name in enumerate(("precision", "recall", "f1"))}
+        scores.update({name: [s[i] for s in rouge] for i, name in enumerate(ROUGE_TYPES)})
+        return scores
+
+
+def _mean(values: List[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def print_scores(scores: Dict[str, List[float]]):
+    print(f"\n--- BERTScore ---")
+    print(f"Precision: {_mean(scores['precision']):.4f}")
+    print(f"Recall:    {_mean(scores['recall']):.4f}")
+    print(f"F1 Score:  {_mean(scores['f1']):.4f}")
+
+    print(f"\n--- ROUGE Scores ---")
+    print(f"ROUGE-1 F1: {_mean(scores['rouge1']):.4f}")
+    print(f"ROUGE-2 F1: {_mean(scores['rouge2']):.4f}")
+    print(f"ROUGE-L F1: {_mean(scores['rougeL']):.4f}")
+    print()
+
+
+def evaluate_scores(candidates: List[str], references: List[str], engine: Optional[ScoreEngine] = None):
+    scores = (engine or ScoreEngine()).score(references, candidates)
+    print_scores(scores)
+    return scores
+
+
+def evaluate_files(file_paths: Sequence[str], ref_key: str = "Reference_Answer", gen_key: str = "Generated_Answer",
+                   engine: Optional[ScoreEngine] = None, output: Optional[str] = None,
+                   normalize: bool = False) -> Dict[str, Dict[str, float]]:
+    """Score several model output files in one pass; returns the mean of every metric per file.
+
+    All files' pairs go through the engine together, so the BERTScore model is
+    loaded once and pairs shared between files are scored once.
+    """
+    engine = engine or ScoreEngine()
+    loaded = {path: load_pairs(path, ref_key, gen_key, normalize) for path in file_paths}
+    references = [ref for refs, _ in loaded.values() for ref in refs]
+    candidates = [gen for _, gens in loaded.values() for gen in gens]
+    scores = engine.score(references, candidates)
+
+    summary, offset = {}, 0
+    for path, (refs, _) in loaded.items():
+        file_scores = {name: values[offset:offset + len(refs)] for name, values in scores.items()}
+        offset += len(refs)
+        print(f"\n=== {path} ===")
+        print_scores(file_scores)
+        summary[path] = {"pairs": len(refs), **{name: _mean(values) for name, values in file_scores.items()}}
+
+    if len(summary) > 1:
+        print(f"{'file':<40} {'pairs':>6} {'BERT F1':>8} {'ROUGE-1':>8} {'ROUGE-2':>8} {'ROUGE-L':>8}")
+        for path, s in sorted(summary.items(), key=lambda item: -item[1]["f1"]):
+            print(f"{os.path.basename(path)[:40]:<40} {s['pairs']:>6} {s['f1']:>8.4f} {s['rouge1']:>8.4f} "
+                  f"{s['rouge2']:>8.4f} {s['rougeL']:>8.4f}")
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    return summary
+
+
+def evaluate_file(file_path: str, ref_key: str = "Reference_Answer", gen_key: str = "Generated_Answer",
+                  engine: Optional[ScoreEngine] = None) -> Dict[str, float]:
+    return evaluate_files([file_path], ref_key, gen_key, engine)[file_path]
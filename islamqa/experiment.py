@@ -0,0 +1,145 @@
+"""Retrieve once, answer with many models.
+
+An experiment file lists the model runs to compare; every question is
+retrieved and packed once and the same context goes to each run's model
+concurrently, with one output JSONL per run:
+
+    {
+      "input": "test.jsonl", "limit": 100,
+      "runs": [
+        {"model": "gemini-rag"},
+        {"model": "llama-4-rag", "temperature": 0.2, "output": "llama_t0.2(rag).jsonl"}
+      ]
+    }
+
+Each run starts from its entry in models.MODELS; any other key overrides that
+entry. Runs without an `index_path` get the bare question. The context is
+packed to the smallest budget among the runs (or the experiment's "budget"),
+so every model sees the same text.
+"""
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from .generation import (DEFAULT_CONCURRENCY, RESUME, answered_questions, generate_all, open_output,
+                         read_records, record_question)
+from .models import get_model
+from .pipeline import rag_messages, rag_retriever
+from .providers import call_model
+from .telemetry import span, trace
+
+
+def load_experiment(path: str) -> Dict[str, Any]:
+    """The experiment file with every run resolved to a full model config under a unique name."""
+    with open(path, 'r', encoding='utf-8') as f:
+        experiment = json.load(f)
+    if not experiment.get("runs"):
+        raise ValueError(f"{path} has no runs")
+
+    runs = {}
+    for run in experiment["runs"]:
+        overrides = dict(run)
+        config = dict(get_model(overrides.pop("model")), **overrides)
+        name = config["output"]
+        if name in runs:
+            raise ValueError(f"Two runs in {path} write {name}; give one of them its own output")
+        runs[name] = config
+    experiment["runs"] = runs
+
+    index_paths = {config["index_path"] for config in runs.values() if config.get("index_path")}
+    if len(index_paths) > 1:
+        raise ValueError(f"Runs in {path} use different indexes ({', '.join(sorted(index_paths))}); "
+                         f"retrieval is shared, so split them into separate experiments")
+    experiment.setdefault("index_path", index_paths.pop() if index_paths else None)
+    experiment.setdefault("k", max((c.get("k", 5) for c in runs.values() if c.get("index_path")), default=5))
+    return experiment
+
+
+def run_experiment(path: str, limit: Optional[int] = None, concurrency: Optional[int] = None,
+                   resume: bool = RESUME) -> Dict[str, int]:
+    """Run every model in the experiment file over its questions; returns the records written per output file."""
+    from .context_packing import ContextPacker, MODEL_BUDGETS, DEFAULT_BUDGET
+
+    experiment = load_experiment(path)
+    runs: Dict[str, Dict[str, Any]] = experiment["runs"]
+    records = read_records(experiment.get("input", "test.jsonl"), limit=limit or experiment.get("limit", 100))
+    concurrency = concurrency or experiment.get("concurrency") or DEFAULT_CONCURRENCY
+
+    answered = {name: answered_questions(config["output"]) if resume else set() for name, config in runs.items()}
+    if resume:
+        # Questions every run has answered are dropped before prefetch, so they are never retrieved.
+        records = ((idx, data) for idx, data in records
+                   if any(record_question(data) not in questions for questions in answered.values()))
+
+    retriever = packer = None
+    rag_models = [config["model"] for config in runs.values() if config.get("index_path")]
+    # Baseline-only experiments answer from the question alone and never load the index.
+    if rag_models and experiment["index_path"]:
+        retriever = rag_retriever(experiment["index_path"], experiment["k"])
+        packer = ContextPacker(min(rag_models, key=lambda model: MODEL_BUDGETS.get(model, DEFAULT_BUDGET)),
+                               budget=experiment.get("budget"))
+        records = retriever.prefetch(records)
+
+    # Every model call of a question runs at once; the pool allows that for all questions in flight.
+    pool = ThreadPoolExecutor(concurrency * len(runs))
+
+    def answer(config: Dict[str, Any], data: Dict[str, Any], question: str, context, packed):
+        with trace(model=config["model"], question=question[:80]):
+            if not config.get("index_path"):
+                return {
+                    "Question": question,
+                    "Answer": data.get("Answer") or data.get("answer"),
+                    "Document": data.get("Document") or data.get("document"),
+                    "Generated_Answer": call_model(config, [{"role": "user", "content": question}]),
+                }
+            return {
+                "Question": question,
+                "Reference_Answer": data.get("Answer") or data.get("answer"),
+                "Generated_Answer": call_model(config, rag_messages(config, question, packed)),
+                "Retrieved_Docs": [f"{doc.metadata.get('source')}" for doc in context],
+                "Retrieved_Texts": [doc.page_content for doc in context],
+            }
+
+    def generate(data):
+        question = record_question(data)
+        pending = {name: config for name, config in runs.items() if question and question not in answered[name]}
+        if not pending:
+            return None
+
+        context, packed = [], None
+        if retriever is not None:
+            with span("retrieve"):
+                context = retriever.invoke(question)
+            with span("pack"):
+                packed = packer.pack(context)
+
+        futures = {name: pool.submit(answer, config, data, question, context, packed)
+                   for name, config in pending.items()}
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                # One model failing leaves the other models' answers to this question intact.
+                print(f"Error from {name}: {type(e).__name__}: {e}")
+        return results
+
+    outputs = {name: open_output(config["output"], resume) for name, config in runs.items()}
+    written = {config["output"]: 0 for config in runs.values()}
+
+    def write(results: Dict[str, Dict[str, Any]]):
+        for name, result in results.items():
+            with span("write"):
+                outputs[name].write(json.dumps(result, ensure_ascii=False) + '\n')
+                outputs[name].flush()
+            written[runs[name]["output"]] += 1
+        print(f"Processed {max(written.values())}")
+
+    try:
+        asyncio.run(generate_all(records, generate, max(1, concurrency), write))
+    finally:
+        pool.shutdown()
+        for out_file in outputs.values():
+            out_file.close()
+    return written
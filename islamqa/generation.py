@@ -0,0 +1,127 @@
+import os
+import json
+import asyncio
+from collections import deque
+from typing import Dict, Any, Callable, Iterable, Iterator, Optional, Set, Tuple
+
+from .telemetry import count, span
+
+DEFAULT_CONCURRENCY = int(os.getenv("GENERATION_CONCURRENCY", "8"))
+RESUME = os.getenv("GENERATION_RESUME", "0") == "1"
+
+
+def record_question(data: Dict[str, Any]) -> Optional[str]:
+    return data.get("Question") or data.get("question")
+
+
+def read_records(input_file: str, limit: Optional[int] = 100) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    with open(input_file, 'r', encoding='utf-8') as file:
+        for idx, line in enumerate(file):
+            if limit is not None and idx >= limit:
+                break
+            if not line.strip():
+                continue
+            try:
+                yield idx, json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Error at record {idx+1}: {type(e).__name__}: {e}")
+
+
+def answered_questions(output_file: str) -> Set[str]:
+    """Questions already present in an existing output JSONL."""
+    answered = set()
+    if not os.path.exists(output_file):
+        return answered
+    with open(output_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                question = record_question(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+            if question:
+                answered.add(question)
+    return answered
+
+
+def open_output(output_file: str, resume: bool):
+    """`output_file` opened for writing, or with `resume` for appending after its last complete line."""
+    if not resume or not os.path.exists(output_file):
+        return open(output_file, 'w', encoding='utf-8')
+    # A crash mid-write can leave a partial last line; drop it before appending.
+    with open(output_file, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+    return open(output_file, 'a', encoding='utf-8')
+
+
+async def generate_all(records, process, concurrency: int, on_result: Callable[[Any], None]):
+    """Run `process` on each `(idx, data)` record in a worker thread, at most `concurrency` at once.
+
+    `on_result` gets every non-None result in input order. Failed records are logged and dropped.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    # Completed results wait here until every earlier record is written, so
+    # output order matches input order. The window bounds memory.
+    window = concurrency * 4
+    pending = deque()
+
+    async def worker(idx, data):
+        async with semaphore:
+            try:
+                # Provider SDKs are blocking, so each call runs in a worker thread.
+                return await asyncio.to_thread(process, data)
+            except Exception as e:
+                print(f"Error at record {idx+1}: {type(e).__name__}: {e}")
+                count("records_failed")
+                return None
+
+    async def flush_head():
+        result = await pending.popleft()
+        if result is not None:
+            on_result(result)
+
+    for idx, data in records:
+        pending.append(asyncio.create_task(worker(idx, data)))
+        while pending and (pending[0].done() or len(pending) >= window):
+            await flush_head()
+    while pending:
+        await flush_head()
+
+
+def run_generation(records: Iterable[Tuple[int, Dict[str, Any]]],
+                   process: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+                   output_file: str,
+                   concurrency: int = DEFAULT_CONCURRENCY,
+                   resume: bool = RESUME,
+                   prefetch: Optional[Callable[[Iterable], Iterable]] = None) -> int:
+    """Run `process` over `records` with at most `concurrency` calls in flight.
+
+    `process` takes one input record and returns the output record, or None to
+    skip it. Failed records are logged and dropped. Each result is appended to
+    `output_file` and flushed as soon as it is ready, in input order. With
+    `resume`, questions already in `output_file` are skipped and new results
+    are appended. `prefetch` (e.g. BatchRetriever.prefetch) wraps the records
+    left after that filter. Returns the number of records written.
+    """
+    if resume:
+        answered = answered_questions(output_file)
+        if answered:
+            print(f"Resuming: {len(answered)} records already in {output_file}")
+        records = ((idx, data) for idx, data in records if record_question(data) not in answered)
+    if prefetch is not None:
+        records = prefetch(records)
+
+    written = 0
+    with open_output(output_file, resume) as out_file:
+        def write(result):
+            nonlocal written
+            with span("write"):
+                out_file.write(json.dumps(result, ensure_ascii=False) + '\n')
+                out_file.flush()
+            written += 1
+            count("records_written")
+            print(f"Processed {written}")
+
+        asyncio.run(generate_all(records, process, max(1, concurrency), write))
+    return written
@@ -0,0 +1,165 @@
+import os
+import re
+import json
+from collections import Counter
+from typing import List, Dict, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from .docstore import INDEX_FILE
+from .retrieval import BatchRetriever, docs_at, embed_questions
+from .telemetry import span
+
+BM25_DIR = "bm25"
+TOKEN_PATTERN = re.compile(r"\w+")
+# Query terms found in more than this fraction of chunks are skipped while the query has rarer ones.
+BM25_MAX_DF = float(os.getenv("BM25_MAX_DF", "0.1"))
+# Ignored in queries only; the index keeps every term.
+STOPWORDS = frozenset("""
+a an and are as at be but by do does did for from had has have he her his how i if in into is it its
+me my no not of on or our she so than that the their them then there these they this to was we were
+what when where which who whom why will with would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Inverted index over the chunks of a vector store, addressed by FAISS row position.
+
+    Postings are stored CSR-style with the BM25 term weight precomputed per
+    (term, chunk), so scoring a query only gathers and sums the postings of its
+    terms, with no per-chunk Python work.
+    """
+
+    def __init__(self, vocab: Dict[str, int], indptr: np.ndarray, postings: np.ndarray,
+                 weights: np.ndarray, n_docs: int, max_df: float = BM25_MAX_DF):
+        self.vocab = vocab
+        self.indptr = indptr
+        self.postings = postings
+        self.weights = weights
+        self.n_docs = n_docs
+        self.max_df = max_df
+
+    @classmethod
+    def build(cls, texts: List[str], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        vocab: Dict[str, int] = {}
+        term_ids, positions, tfs = [], [], []
+        lengths = np.zeros(len(texts), dtype=np.float32)
+        for pos, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths[pos] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                term_ids.append(vocab.setdefault(term, len(vocab)))
+                positions.append(pos)
+                tfs.append(tf)
+
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        # Stable sort keeps each term's postings in chunk order.
+        order = np.argsort(term_ids, kind="stable")
+        postings = np.asarray(positions, dtype=np.int32)[order]
+        tfs = np.asarray(tfs, dtype=np.float32)[order]
+        df = np.bincount(term_ids, minlength=len(vocab))
+        indptr = np.concatenate([[0], np.cumsum(df)]).astype(np.int64)
+
+        idf = np.log(1 + (len(texts) - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avg_length = max(float(lengths.mean()), 1e-9) if len(texts) else 1.0
+        norm = k1 * (1 - b + b * lengths[postings] / avg_length)
+        weights = np.repeat(idf, df) * tfs * (k1 + 1) / (tfs + norm)
+        return cls(vocab, indptr, postings, weights.astype(np.float32), len(texts))
+
+    def search(self, query: str, k: int):
+        """Positions and scores of the top-k chunks, best first; only chunks sharing a term with the query.
+
+        Stopwords are ignored, and so are terms in more than `max_df` of the
+        chunks while the query has rarer ones: their idf is near zero but
+        their postings would dominate the work. Scores are summed into a dense
+        per-chunk array with one bincount and the top k picked with argpartition,
+        so a query costs O(postings + chunks) with no sorting of postings.
+        """
+        terms = set(tokenize(query))
+        term_ids = [i for i in (self.vocab.get(t) for t in terms - STOPWORDS or terms) if i is not None]
+        if not term_ids:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        lengths = {i: int(self.indptr[i + 1] - self.indptr[i]) for i in term_ids}
+        term_ids = [i for i in term_ids if lengths[i] <= self.max_df * self.n_docs] or [min(term_ids, key=lengths.get)]
+        spans = [(self.indptr[i], self.indptr[i + 1]) for i in term_ids]
+        positions = np.concatenate([self.postings[start:end] for start, end in spans])
+        weights = np.concatenate([self.weights[start:end] for start, end in spans])
+        scores = np.bincount(positions, weights=weights, minlength=self.n_docs)
+        k = min(k, self.n_docs)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[scores[top] > 0]
+        top = top[np.argsort(-scores[top])]
+        return top.astype(np.int64), scores[top].astype(np.float32)
+
+    def save(self, path: str, flat_mtime: float):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "indptr.npy"), self.indptr)
+        np.save(os.path.join(path, "postings.npy"), self.postings)
+        np.save(os.path.join(path, "weights.npy"), self.weights)
+        with open(os.path.join(path, "vocab.json"), 'w', encoding='utf-8') as f:
+            json.dump({"n_docs": self.n_docs, "flat_mtime": flat_mtime, "vocab": self.vocab}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str, flat_mtime: float) -> Optional["BM25Index"]:
+        vocab_path = os.path.join(path, "vocab.json")
+        if not os.path.exists(vocab_path):
+            return None
+        with open(vocab_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta["flat_mtime"] != flat_mtime:
+            return None
+        return cls(meta["vocab"],
+                   np.load(os.path.join(path, "indptr.npy"), mmap_mode="r"),
+                   np.load(os.path.join(path, "postings.npy"), mmap_mode="r"),
+                   np.load(os.path.join(path, "weights.npy"), mmap_mode="r"),
+                   meta["n_docs"])
+
+
+def load_or_build_bm25(vector_db, index_path) -> BM25Index:
+    """BM25 index stored next to the FAISS index; rebuilt whenever index.faiss is rewritten."""
+    index_path = str(index_path)
+    bm25_path = os.path.join(index_path, BM25_DIR)
+    flat_mtime = os.path.getmtime(os.path.join(index_path, INDEX_FILE))
+    bm25 = BM25Index.load(bm25_path, flat_mtime)
+    if bm25 is None:
+        n_docs = vector_db.index.ntotal
+        print(f"Building BM25 index over {n_docs} chunks...")
+        # One text per FAISS position, so BM25 positions line up with the dense index.
+        texts = [(docs_at(vector_db, [pos]) or [Document(page_content="")])[0].page_content for pos in range(n_docs)]
+        bm25 = BM25Index.build(texts)
+        bm25.save(bm25_path, flat_mtime)
+    return bm25
+
+
+class HybridRetriever(BatchRetriever):
+    """Dense FAISS search and BM25 over the same chunks, merged with reciprocal-rank fusion."""
+
+    def __init__(self, vector_db, index_path, k: int = 5, candidates: int = 20, rrf_k: int = 60):
+        super().__init__(vector_db, k)
+        self.bm25 = load_or_build_bm25(vector_db, index_path)
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+
+    def retrieve_batch(self, questions: List[str]) -> List[List[Document]]:
+        if not questions:
+            return []
+        vectors = embed_questions(self.vector_db, questions)
+        with span("search"):
+            _, dense = self.vector_db.index.search(vectors, self.candidates)
+        results = []
+        for question, dense_row in zip(questions, dense):
+            with span("bm25"):
+                sparse_row, _ = self.bm25.search(question, self.candidates)
+            fused: Dict[int, float] = {}
+            for ranking in (dense_row, sparse_row):
+                for rank, pos in enumerate(ranking):
+                    if pos != -1:
+                        fused[int(pos)] = fused.get(int(pos), 0.0) + 1.0 / (self.rrf_k + rank + 1)
+            best = sorted(fused, key=fused.get, reverse=True)[:self.k]
+            results.append(docs_at(self.vector_db, best))
+        return results
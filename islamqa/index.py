@@ -0,0 +1,118 @@
+import os
+import json
+import shutil
+from typing import List, Dict, Any, Optional
+
+from langchain_community.document_loaders.csv_loader import CSVLoader
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+
+from .ann_index import INDEX_TYPE, use_index_type
+from .docstore import load_faiss, save_vector_db
+from .ingest import WORKERS, build_vector_db, chunk_ids
+from .models import EMBEDDER_NAME, LOCAL_DB_PATH
+
+FAISS_INDEX_PATH = LOCAL_DB_PATH
+MANIFEST_FILE = "manifest.json"
+CSV_FILES_CONFIG = [
+    {"path": "sahih_bukhari.csv", "source_column": "hadithEnglish", "source_type": "Sahih Bukhari", "encoding": "utf-8"},
+    {"path": "sahih_muslim.csv", "source_column": "hadithEnglish", "source_type": "Sahih Muslim", "encoding": "utf-8"},
+    {"path": "merged_quran.csv", "source_column": "Ayah Translation", "source_type": "Quran", "encoding": "utf-8"}
+]
+
+def load_and_chunk_documents(csv_configs: List[Dict[str, Any]]) -> List[Document]:
+    all_documents = []
+    for config in csv_configs:
+        if not os.path.exists(config["path"]):
+            print(f"Warning: CSV not found: {config['path']}")
+            continue
+        loader = CSVLoader(file_path=config["path"], source_column=config["source_column"], encoding=config["encoding"])
+        documents = loader.load()
+        for doc in documents:
+            if doc.page_content.strip():
+                doc.metadata.update({"source_type": config["source_type"], "original_file": config["path"]})
+                all_documents.append(doc)
+    if not all_documents:
+        raise ValueError("No documents loaded from CSVs.")
+    
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1500, chunk_overlap=200)
+    return splitter.split_documents(all_documents)
+
+def load_manifest(index_path: str) -> Optional[Dict[str, List[str]]]:
+    manifest_path = os.path.join(index_path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_manifest(index_path: str, manifest: Dict[str, List[str]]):
+    with open(os.path.join(index_path, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+def create_vector_db(index_path: str, embeddings_model, csv_configs, workers: int = WORKERS):
+    vector_db, manifest = build_vector_db(csv_configs, embeddings_model, workers)
+    save_vector_db(vector_db, index_path)
+    save_manifest(index_path, manifest)
+    return vector_db
+
+def update_vector_db(vector_db, index_path: str, csv_configs):
+    """Bring an existing index in line with the CSVs, embedding only new or changed chunks."""
+    manifest = load_manifest(index_path)
+    configured = {config["path"] for config in csv_configs}
+    present = [config for config in csv_configs if os.path.exists(config["path"])]
+    docs = load_and_chunk_documents(present)
+    ids = chunk_ids(docs)
+
+    current: Dict[str, List[str]] = {config["path"]: [] for config in present}
+    for doc_id, doc in zip(ids, docs):
+        current[doc.metadata["original_file"]].append(doc_id)
+
+    stale = []
+    for path, old_ids in manifest.items():
+        # Sources dropped from the config are removed; a CSV that is only missing on disk keeps its chunks.
+        if path not in configured:
+            stale.extend(old_ids)
+        elif path in current:
+            stale.extend(set(old_ids) - set(current[path]))
+
+    known = {doc_id for path, old_ids in manifest.items() if path in current for doc_id in old_ids}
+    new = [(doc_id, doc) for doc_id, doc in zip(ids, docs) if doc_id not in known]
+
+    if stale:
+        vector_db.delete(stale)
+    if new:
+        vector_db.add_documents([doc for _, doc in new], ids=[doc_id for doc_id, _ in new])
+    print(f"Index update: {len(new)} chunks added, {len(stale)} removed")
+
+    for path in list(manifest):
+        if path not in configured:
+            del manifest[path]
+    manifest.update(current)
+    save_vector_db(vector_db, index_path)
+    save_manifest(index_path, manifest)
+    return vector_db
+
+def get_or_create_vector_db(index_path: str, embeddings_model, csv_configs, force_recreate=False, update=False,
+                            index_type: Optional[str] = INDEX_TYPE, index_params: Optional[Dict[str, Any]] = None):
+    if force_recreate and os.path.exists(index_path):
+        shutil.rmtree(index_path)
+
+    if os.path.exists(index_path) and update and load_manifest(index_path) is None:
+        print(f"No manifest in {index_path}; rebuilding it once so later updates can be incremental.")
+        shutil.rmtree(index_path)
+
+    if os.path.exists(index_path):
+        # Updates always go to the flat index; the approximate index is derived from it.
+        vector_db = load_faiss(index_path, embeddings_model, mmap=not update)
+        if update:
+            vector_db = update_vector_db(vector_db, index_path, csv_configs)
+    else:
+        vector_db = create_vector_db(index_path, embeddings_model, csv_configs)
+
+    return use_index_type(vector_db, index_path, index_type, index_params)
+
+def build_index(index_path: str = FAISS_INDEX_PATH, force_recreate=False, update=False,
+                index_type: Optional[str] = INDEX_TYPE):
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDER_NAME)
+    return get_or_create_vector_db(index_path, embeddings, CSV_FILES_CONFIG, force_recreate, update, index_type)
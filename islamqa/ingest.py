@@ -0,0 +1,137 @@
+import os
+import csv
+import hashlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+
+BATCH_ROWS = int(os.getenv("INGEST_BATCH_ROWS", "256"))
+# Split+embed processes. Each loads its own copy of the embedding model (all-mpnet is ~420 MB, plus
+# torch), so the default stays small; raise INGEST_WORKERS on machines with the memory to spare.
+WORKERS = int(os.getenv("INGEST_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+CHUNK_SIZE = 1500
+CHUNK_OVERLAP = 200
+
+
+def chunk_ids(chunks: List[Document], seen: Optional[Dict[str, int]] = None) -> List[str]:
+    """Content-hash id per chunk, stable across rebuilds as long as the text is unchanged.
+
+    Pass the same `seen` dict across calls when ids are assigned batch by batch.
+    """
+    seen = {} if seen is None else seen
+    ids = []
+    for doc in chunks:
+        key = f"{doc.metadata.get('original_file')}\0{doc.page_content}"
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        count = seen.get(digest, 0)
+        seen[digest] = count + 1
+        # Identical chunks within one file still need distinct docstore ids.
+        ids.append(digest if count == 0 else f"{digest}-{count}")
+    return ids
+
+
+def iter_csv_batches(config: Dict[str, Any], batch_rows: int = BATCH_ROWS) -> Iterator[List[Document]]:
+    """Rows of one CSV as Documents, `batch_rows` at a time (same shape as CSVLoader output)."""
+    with open(config["path"], newline="", encoding=config["encoding"]) as f:
+        batch = []
+        for row_idx, row in enumerate(csv.DictReader(f)):
+            content = "\n".join(
+                f"{k.strip() if k is not None else k}: {v.strip() if isinstance(v, str) else v}"
+                for k, v in row.items()
+            )
+            if not content.strip():
+                continue
+            batch.append(Document(page_content=content, metadata={
+                "source": row[config["source_column"]],
+                "row": row_idx,
+                "source_type": config["source_type"],
+                "original_file": config["path"],
+            }))
+            if len(batch) >= batch_rows:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+_splitter = None
+_embedder = None
+
+
+def _init_worker(embedder, threads: int):
+    global _splitter, _embedder
+    try:
+        import torch
+        # Every worker embeds on its own, so split the cores between them.
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    _embedder = HuggingFaceEmbeddings(model_name=embedder) if isinstance(embedder, str) else embedder
+
+
+def _split_and_embed(docs: List[Document]) -> Tuple[List[Document], np.ndarray]:
+    chunks = _splitter.split_documents(docs)
+    vectors = np.asarray(_embedder.embed_documents([chunk.page_content for chunk in chunks]), dtype=np.float32)
+    return chunks, vectors
+
+
+def _worker_embedder(embeddings_model):
+    # HuggingFace models are reloaded by name in each worker; any other embedder is pickled across.
+    return embeddings_model.model_name if isinstance(embeddings_model, HuggingFaceEmbeddings) else embeddings_model
+
+
+def build_vector_db(csv_configs: List[Dict[str, Any]], embeddings_model, workers: int = WORKERS,
+                    batch_rows: int = BATCH_ROWS) -> Tuple[FAISS, Dict[str, List[str]]]:
+    """Stream the CSVs through a pool of split+embed worker processes into one FAISS index.
+
+    At most two batches per worker are in flight, so memory stays bounded by
+    the batch size rather than the corpus size. Results are added in
+    submission order, which keeps chunk ids deterministic. Returns the index
+    and its chunk-id manifest.
+    """
+    workers = max(1, workers)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    vector_db = None
+    manifest: Dict[str, List[str]] = {}
+    seen: Dict[str, int] = {}
+    pending = deque()
+
+    def add_oldest():
+        nonlocal vector_db
+        chunks, vectors = pending.popleft().result()
+        if not chunks:
+            return
+        ids = chunk_ids(chunks, seen)
+        text_embeddings = list(zip([chunk.page_content for chunk in chunks], vectors))
+        metadatas = [chunk.metadata for chunk in chunks]
+        if vector_db is None:
+            vector_db = FAISS.from_embeddings(text_embeddings, embeddings_model, metadatas=metadatas, ids=ids)
+        else:
+            vector_db.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+        for chunk, doc_id in zip(chunks, ids):
+            manifest.setdefault(chunk.metadata["original_file"], []).append(doc_id)
+        print(f"Indexed {vector_db.index.ntotal} chunks")
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(_worker_embedder(embeddings_model), threads)) as pool:
+        for config in csv_configs:
+            if not os.path.exists(config["path"]):
+                print(f"Warning: CSV not found: {config['path']}")
+                continue
+            for batch in iter_csv_batches(config, batch_rows):
+                pending.append(pool.submit(_split_and_embed, batch))
+                while len(pending) > 2 * workers:
+                    add_oldest()
+        while pending:
+            add_oldest()
+
+    if vector_db is None:
+        raise ValueError("No documents loaded from CSVs.")
+    return vector_db, manifest
@@ -0,0 +1,187 @@
+import re
+import time
+import threading
+from typing import List, Any, Callable, Optional
+
+from .telemetry import count, span
+
+DEFAULT_COOLDOWN = 60.0
+
+_RETRY_DELAY_PATTERN = re.compile(r"retry[_ ]?delay\s*\{\s*seconds:\s*(\d+)|retry in ([\d.]+)\s*s", re.IGNORECASE)
+
+
+def estimate_tokens(messages, max_tokens: int = 0) -> int:
+    """Rough prompt + completion token count (~4 characters per token)."""
+    if isinstance(messages, str):
+        text = messages
+    elif isinstance(messages, list):
+        text = "".join(m.get("content", "") if isinstance(m, dict) else str(m) for m in messages)
+    else:
+        text = str(messages)
+    return len(text) // 4 + max_tokens
+
+
+def _status_code(e: Exception) -> Optional[int]:
+    for value in (getattr(e, "status_code", None), getattr(e, "code", None),
+                  getattr(getattr(e, "response", None), "status_code", None)):
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_rate_limit_error(e: Exception) -> bool:
+    if _status_code(e) == 429:
+        return True
+    if type(e).__name__ in ("RateLimitError", "ResourceExhausted", "TooManyRequests"):
+        return True
+    message = str(e).lower()
+    return "429" in message or "rate_limit" in message or "rate limit" in message or "quota" in message
+
+
+def is_transient_error(e: Exception) -> bool:
+    """Errors worth retrying on another key: timeouts, dropped connections and server-side failures."""
+    status = _status_code(e)
+    if status is not None:
+        return status in (408, 409) or status >= 500
+    if isinstance(e, (ConnectionError, TimeoutError)):
+        return True
+    return type(e).__name__ in ("APIConnectionError", "APITimeoutError", "InternalServerError",
+                                "ServiceUnavailable", "DeadlineExceeded", "ConnectError", "ReadTimeout")
+
+
+def retry_after_seconds(e: Exception) -> Optional[float]:
+    response = getattr(e, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    match = _RETRY_DELAY_PATTERN.search(str(e))
+    if match:
+        return float(match.group(1) or match.group(2))
+    return None
+
+
+class TokenBucket:
+    def __init__(self, capacity: Optional[float]):
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        if self.capacity is None:
+            return
+        # Quotas are per minute, so a full bucket refills in 60 seconds.
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60.0)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        if self.capacity is None:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60.0 / self.capacity
+
+    def take(self, amount: float):
+        if self.capacity is not None:
+            self.level -= min(amount, self.capacity)
+
+
+class KeyState:
+    def __init__(self, key: str, rpm: Optional[int], tpm: Optional[int]):
+        self.key = key
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.client = None
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        return max(self.cooldown_until - now,
+                   self.requests.wait_time(1, now),
+                   self.tokens.wait_time(tokens, now))
+
+
+class KeyPool:
+    """Schedules calls across API keys, each with its own RPM/TPM token bucket.
+
+    Every call goes to the ready key with the most spare request capacity, so
+    concurrent callers spread over all healthy keys instead of draining them in
+    order. A 429 puts the key into cooldown for its Retry-After period.
+    Only rate limits and transient errors are retried on another key; anything
+    else (a bad key, a malformed request) is raised at once.
+    """
+
+    def __init__(self, keys: List[Optional[str]], client_factory: Callable[[str], Any] = None,
+                 rpm: Optional[int] = None, tpm: Optional[int] = None, name: str = "API"):
+        self.name = name
+        self.client_factory = client_factory
+        self.states = [KeyState(key, rpm, tpm) for key in keys if key]
+        if not self.states:
+            raise ValueError(f"No {name} API keys configured.")
+        self.condition = threading.Condition()
+
+    def acquire(self, tokens: int = 0) -> KeyState:
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                waits = [(state.wait_time(tokens, now), state) for state in self.states]
+                ready = [state for wait, state in waits if wait <= 0]
+                if ready:
+                    state = max(ready, key=lambda s: (s.requests.level or 0) - s.in_flight)
+                    state.requests.take(1)
+                    state.tokens.take(tokens)
+                    state.in_flight += 1
+                    return state
+                self.condition.wait(timeout=min(wait for wait, _ in waits))
+
+    def release(self, state: KeyState, retry_after: Optional[float] = None):
+        with self.condition:
+            state.in_flight -= 1
+            if retry_after is not None:
+                state.cooldown_until = max(state.cooldown_until, time.monotonic() + retry_after)
+            self.condition.notify_all()
+
+    def get_client(self, state: KeyState):
+        if self.client_factory is None:
+            return state.key
+        # Clients are built once per key and reused across calls.
+        with self.condition:
+            if state.client is None:
+                state.client = self.client_factory(state.key)
+            return state.client
+
+    def call(self, fn: Callable[[Any], Any], tokens: int = 0, max_attempts: Optional[int] = None):
+        """Call `fn(client)` on the next ready key, retrying rate-limited and transient failures on other keys."""
+        max_attempts = max_attempts or 3 * len(self.states)
+        last_error = None
+        for _ in range(max_attempts):
+            with span("key_wait", provider=self.name):
+                state = self.acquire(tokens)
+            # Keys are identified by their position in the pool, never by value.
+            key_id = self.states.index(state)
+            count("key_attempts", provider=self.name, key=key_id)
+            try:
+                result = fn(self.get_client(state))
+            except Exception as e:
+                last_error = e
+                count("key_failures", provider=self.name, key=key_id)
+                print(f"[!] Key failed: {state.key[:8]}... | {type(e).__name__}: {e}")
+                if is_rate_limit_error(e):
+                    count("rate_limited", provider=self.name, key=key_id)
+                    delay = retry_after_seconds(e) or DEFAULT_COOLDOWN
+                    print(f"[!] Rate limited. Cooling key down for {delay:.0f}s...")
+                    self.release(state, retry_after=delay)
+                    continue
+                self.release(state)
+                if not is_transient_error(e):
+                    raise
+                continue
+            self.release(state)
+            return result
+        raise RuntimeError(f"All {self.name} API keys failed or quota exhausted.") from last_error
@@ -0,0 +1,157 @@
+import os
+import json
+import time
+import atexit
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite")
+CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "0")) or None
+CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "100000"))
+
+
+def cache_key(provider: str, model: str, messages: Any, temperature: Optional[float], max_tokens: Optional[int]) -> str:
+    payload = json.dumps({
+        "provider": provider,
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+    }, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """On-disk LLM response cache keyed by a hash of the full request.
+
+    Entries older than `ttl` seconds count as misses. Once the table grows past
+    `max_entries`, the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, ttl: Optional[float] = CACHE_TTL,
+                 max_entries: int = CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, response: str):
+        now = time.time()
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, response, now, now))
+            self.conn.commit()
+        self._evict()
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        now = time.time()
+        found = {}
+        with self.lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT key, response, created FROM responses WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                for key, response, created in rows:
+                    if self.ttl is None or now - created <= self.ttl:
+                        found[key] = response
+            self.conn.executemany("UPDATE responses SET accessed = ? WHERE key = ?", [(now, key) for key in found])
+            self.conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, items: Dict[str, str]):
+        now = time.time()
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                                  [(key, response, now, now) for key, response in items.items()])
+            self.conn.commit()
+        self._evict()
+
+    def _evict(self):
+        with self.lock:
+            count = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                self.conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+                self.conn.commit()
+
+    def cached_call(self, provider: str, model: str, messages: Any, temperature: Optional[float],
+                    max_tokens: Optional[int], fn: Callable[[], str]) -> str:
+        key = cache_key(provider, model, messages, temperature, max_tokens)
+        response = self.get(key)
+        if response is None:
+            response = fn()
+            self.set(key, response)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+
+class _NoCache:
+    def cached_call(self, provider, model, messages, temperature, max_tokens, fn):
+        return fn()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Process-wide cache configured from LLM_CACHE* env vars (LLM_CACHE=0 disables it)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            if not CACHE_ENABLED:
+                _cache = _NoCache()
+            else:
+                _cache = ResponseCache()
+                atexit.register(_print_stats, _cache)
+    return _cache
+
+
+def _print_stats(cache: ResponseCache):
+    stats = cache.stats()
+    if stats["hits"] or stats["misses"]:
+        print(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries")
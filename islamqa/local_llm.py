@@ -0,0 +1,197 @@
+import os
+import copy
+import time
+import queue
+import atexit
+import threading
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+# "int8" (torch dynamic quantization), "int4" (needs optimum-quanto) or "none".
+QUANTIZATION = os.getenv("LOCAL_LLM_QUANT", "int8")
+BATCH_SIZE = int(os.getenv("LOCAL_LLM_BATCH", "8"))
+MAX_BATCH_TOKENS = int(os.getenv("LOCAL_LLM_BATCH_TOKENS", "16384"))
+THREADS = int(os.getenv("LOCAL_LLM_THREADS", "0")) or os.cpu_count() or 1
+# Shorter shared prefixes are not worth a cached KV copy per batch.
+MIN_PREFIX_TOKENS = 32
+PREFIX_MARGIN_TOKENS = 4
+
+
+def load_model(model_name: str, quantization: str = QUANTIZATION):
+    """Causal LM and tokenizer on CPU with int8 or int4 weights.
+
+    int8 loads float32 weights and converts every Linear layer with torch's
+    dynamic quantization, so loading peaks at full float32 size. int4 quantizes
+    while loading through transformers' QuantoConfig.
+    """
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+
+    if quantization not in ("int8", "int4", "none"):
+        raise ValueError(f"Unknown quantization: {quantization} (expected 'int8', 'int4' or 'none')")
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    tokenizer.padding_side = "left"
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+    if quantization == "int4":
+        try:
+            from transformers import QuantoConfig
+            import optimum.quanto  # noqa: F401
+        except ImportError as e:
+            raise ImportError("int4 weights need optimum-quanto: pip install optimum-quanto") from e
+        model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float32, low_cpu_mem_usage=True,
+                                                     quantization_config=QuantoConfig(weights="int4"))
+    else:
+        model = AutoModelForCausalLM.from_pretrained(model_name, torch_dtype=torch.float32, low_cpu_mem_usage=True)
+        if quantization == "int8":
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    model.eval()
+    return model, tokenizer
+
+
+class LocalLLM:
+    """CPU text generation that batches concurrent `generate` calls.
+
+    Callers block on `generate` from any thread (e.g. the run_generation
+    workers). A background thread collects the pending prompts, sorts them by
+    token length so each batch pads as little as possible, and runs them as
+    left-padded batches of up to `batch_size` prompts and `max_batch_tokens`
+    padded tokens.
+
+    With `prefix_messages` (the fixed start of every chat, e.g. the system
+    prompt and the template text before the first field), the rendered prefix's KV
+    cache is computed once and shared by every batch of prompts that start
+    with it: those rows are laid out as prefix, padding, rest of the prompt,
+    with the padding masked out, so only the rest is run through the model.
+    """
+
+    def __init__(self, model_name: str, max_new_tokens: int = 512, temperature: float = 0.0,
+                 quantization: str = QUANTIZATION, batch_size: int = BATCH_SIZE,
+                 max_batch_tokens: int = MAX_BATCH_TOKENS, threads: int = THREADS, max_wait: float = 0.05,
+                 model=None, tokenizer=None, prefix_messages: Optional[List[dict]] = None):
+        import torch
+
+        torch.set_num_threads(threads)
+        self.model_name = model_name
+        if model is None:
+            model, tokenizer = load_model(model_name, quantization)
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_new_tokens = max_new_tokens
+        self.temperature = temperature
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_wait = max_wait
+        self.queue: "queue.Queue[Tuple[List[int], Future]]" = queue.Queue()
+        self.generated_tokens = 0
+        self.generation_time = 0.0
+        self.batches = 0
+        self.reused_tokens = 0
+        self.prefix_ids: List[int] = []
+        self.prefix_cache = None
+        if prefix_messages:
+            self._encode_prefix(self._render_prefix(prefix_messages))
+        threading.Thread(target=self._loop, daemon=True).start()
+        atexit.register(self._print_stats)
+
+    def generate(self, prompt: str) -> str:
+        future = Future()
+        self.queue.put((self.tokenizer(prompt, add_special_tokens=False).input_ids, future))
+        return future.result()
+
+    def chat(self, messages: List[dict]) -> str:
+        return self.generate(self.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True))
+
+    def _render_prefix(self, messages: List[dict]) -> str:
+        """The chat-template rendering of `messages` up to the end of the last message's text."""
+        marker = "\x00PREFIX_END\x00"
+        messages = messages[:-1] + [dict(messages[-1], content=messages[-1]["content"] + marker)]
+        return self.tokenizer.apply_chat_template(messages, tokenize=False).split(marker, 1)[0]
+
+    def _encode_prefix(self, prefix: str):
+        import torch
+
+        # The last few tokens can merge with whatever follows the prefix, so they are left to each prompt.
+        ids = self.tokenizer(prefix, add_special_tokens=False).input_ids[:-PREFIX_MARGIN_TOKENS]
+        if len(ids) < MIN_PREFIX_TOKENS:
+            return
+        with torch.inference_mode():
+            self.prefix_cache = self.model(torch.tensor([ids]), use_cache=True).past_key_values
+        self.prefix_ids = ids
+
+    def _has_prefix(self, ids: List[int]) -> bool:
+        n = len(self.prefix_ids)
+        return n > 0 and len(ids) > n and ids[:n] == self.prefix_ids
+
+    def _collect(self) -> List[Tuple[List[int], Future]]:
+        pending = [self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(pending) < self.batch_size * 4:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                pending.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return pending
+
+    def _batches(self, pending):
+        # Prompts that share the cached prefix are batched apart from the rest.
+        pending.sort(key=lambda item: (self._has_prefix(item[0]), len(item[0])))
+        batch = []
+        for item in pending:
+            longest = max(len(item[0]), len(batch[-1][0]) if batch else 0)
+            if batch and (len(batch) >= self.batch_size or longest * (len(batch) + 1) > self.max_batch_tokens
+                          or self._has_prefix(item[0]) != self._has_prefix(batch[-1][0])):
+                yield batch
+                batch = []
+            batch.append(item)
+        if batch:
+            yield batch
+
+    def _loop(self):
+        while True:
+            for batch in self._batches(self._collect()):
+                try:
+                    outputs = self._run([ids for ids, _ in batch])
+                except Exception as e:
+                    for _, future in batch:
+                        future.set_exception(e)
+                    continue
+                for (_, future), text in zip(batch, outputs):
+                    future.set_result(text)
+
+    def _run(self, batch_ids: List[List[int]]) -> List[str]:
+        import torch
+
+        prefix = self.prefix_ids if self._has_prefix(batch_ids[0]) else []
+        rows = [ids[len(prefix):] for ids in batch_ids]
+        width = max(len(ids) for ids in rows)
+        pad = self.tokenizer.pad_token_id
+        input_ids = torch.tensor([prefix + [pad] * (width - len(ids)) + ids for ids in rows])
+        attention_mask = torch.tensor([[1] * len(prefix) + [0] * (width - len(ids)) + [1] * len(ids) for ids in rows])
+        sampling = {"do_sample": True, "temperature": self.temperature} if self.temperature > 0 else {"do_sample": False}
+        if prefix:
+            cache = copy.deepcopy(self.prefix_cache)
+            cache.batch_repeat_interleave(len(rows))
+            sampling["past_key_values"] = cache
+
+        start = time.perf_counter()
+        with torch.inference_mode():
+            output = self.model.generate(input_ids=input_ids, attention_mask=attention_mask,
+                                         max_new_tokens=self.max_new_tokens, pad_token_id=pad, **sampling)
+        new_tokens = output[:, len(prefix) + width:]
+        self.reused_tokens += len(prefix) * len(rows)
+        self.generation_time += time.perf_counter() - start
+        self.generated_tokens += int((new_tokens != pad).sum())
+        self.batches += 1
+        return [text.strip() for text in self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)]
+
+    def _print_stats(self):
+        if self.batches:
+            print(f"Local LLM ({self.model_name}): {self.generated_tokens} tokens in {self.batches} batches, "
+                  f"{self.generated_tokens / self.generation_time:.1f} tokens/s, "
+                  f"{self.reused_tokens} prompt tokens served from the prefix cache")
@@ -0,0 +1,355 @@
+"""Local stand-in for the chat-completions and Gemini generateContent APIs.
+
+Serves the endpoints the providers call (OpenAI/OpenRouter/GitHub Models,
+Groq, Hugging Face and Gemini REST) with configurable latency, token rate,
+per-key rate limits, injected 429/quota errors and streaming, so concurrency,
+key failover and rate limiting can be load-tested without spending quota:
+
+    islamqa mock --port 8000 --latency-ms 400 --tokens-per-second 80 --rpm 30 --error-rate 0.05
+    LLM_BASE_URL=http://127.0.0.1:8000 islamqa generate --model deepseek-rag
+
+Every request's latency, length and injected error are drawn from a random
+generator seeded by (--seed, prompt, attempt number of that prompt), so a
+rerun sees the same behaviour regardless of request order. GET /stats returns
+request, token and error counts per key.
+"""
+import re
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+_GEMINI_PATH = re.compile(r"/models/(?P<model>[^/:]+):(?P<method>generateContent|streamGenerateContent)$")
+_WORDS = ("the", "prophet", "said", "that", "allah", "is", "merciful", "and", "the", "quran", "states",
+          "in", "this", "matter", "scholars", "agree", "prayer", "charity", "fasting", "knowledge")
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class MockBehaviour:
+    """Latency, length and failure model shared by every endpoint."""
+
+    def __init__(self, latency_ms: float = 300.0, latency_dist: str = "lognormal", latency_sigma: float = 0.5,
+                 tokens_per_second: float = 100.0, output_tokens: int = 64, reply: Optional[str] = None,
+                 rpm: Optional[int] = None, error_rate: float = 0.0, quota_keys: Tuple[str, ...] = (),
+                 retry_after: float = 2.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.reply = reply
+        self.rpm = rpm
+        self.error_rate = error_rate
+        self.quota_keys = set(quota_keys)
+        self.retry_after = retry_after
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.attempts: Dict[str, int] = defaultdict(int)
+        self.windows: Dict[str, deque] = defaultdict(deque)
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def rng(self, prompt: str) -> random.Random:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with self.lock:
+            self.attempts[digest] += 1
+            attempt = self.attempts[digest]
+        return random.Random(f"{self.seed}:{digest}:{attempt}")
+
+    def first_token_delay(self, rng: random.Random) -> float:
+        if self.latency_dist == "fixed":
+            ms = self.latency_ms
+        elif self.latency_dist == "uniform":
+            ms = rng.uniform(0, 2 * self.latency_ms)
+        elif self.latency_dist == "exponential":
+            ms = rng.expovariate(1 / self.latency_ms) if self.latency_ms else 0.0
+        else:
+            # Median at latency_ms with a long right tail, like real provider latency.
+            ms = self.latency_ms * rng.lognormvariate(0, self.latency_sigma)
+        return ms / 1000
+
+    def rejection(self, key: str, rng: random.Random) -> Optional[str]:
+        """Why this request gets a 429, or None to serve it."""
+        if key in self.quota_keys:
+            return "quota"
+        if self.rpm:
+            now = time.monotonic()
+            with self.lock:
+                window = self.windows[key]
+                while window and now - window[0] >= 60:
+                    window.popleft()
+                if len(window) >= self.rpm:
+                    return "rate_limit"
+                window.append(now)
+        if self.error_rate and rng.random() < self.error_rate:
+            return "rate_limit"
+        return None
+
+    def completion(self, prompt: str, max_tokens: Optional[int], rng: random.Random) -> List[str]:
+        """The reply as a list of token-sized pieces."""
+        if self.reply is not None:
+            return re.findall(r"\S+\s*", self.reply) or [""]
+        limit = min(self.output_tokens, max_tokens) if max_tokens else self.output_tokens
+        n = max(1, int(limit * rng.uniform(0.5, 1.0)))
+        echo = prompt.split()[-8:]
+        words = ["Mock", "answer:"] + echo + [rng.choice(_WORDS) for _ in range(n)]
+        return [word + " " for word in words[:n]]
+
+    def record(self, key: str, name: str, amount: int = 1):
+        with self.lock:
+            self.stats[key][name] += amount
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self.lock:
+            return {key: dict(counts) for key, counts in self.stats.items()}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    behaviour: MockBehaviour = None
+    quiet = True
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def _api_key(self) -> str:
+        auth = self.headers.get("Authorization", "")
+        if auth.lower().startswith("bearer "):
+            return auth[7:]
+        query = parse_qs(urlparse(self.path).query)
+        return self.headers.get("x-goog-api-key") or (query.get("key") or ["anonymous"])[0]
+
+    def _send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _start_stream(self, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _write_chunk(self, data: str):
+        payload = data.encode("utf-8")
+        self.wfile.write(f"{len(payload):x}\r\n".encode("ascii") + payload + b"\r\n")
+        self.wfile.flush()
+
+    def _end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _interval(self) -> float:
+        return 1 / self.behaviour.tokens_per_second if self.behaviour.tokens_per_second else 0.0
+
+    def _paced(self, pieces: List[str], first_delay: float) -> Iterator[str]:
+        time.sleep(first_delay)
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(self._interval())
+            yield piece
+
+    def _reject(self, gemini: bool, reason: str, key: str):
+        self.behaviour.record(key, "rejected_" + reason)
+        headers = {"Retry-After": f"{self.behaviour.retry_after:g}"}
+        if gemini:
+            message = "Resource has been exhausted (e.g. check quota)."
+            self._send_json(429, {"error": {"code": 429, "message": message, "status": "RESOURCE_EXHAUSTED"}}, headers)
+        else:
+            message = ("You exceeded your current quota" if reason == "quota"
+                       else f"Rate limit reached, please try again in {self.behaviour.retry_after:g}s")
+            self._send_json(429, {"error": {"message": message, "type": "requests",
+                                            "code": "insufficient_quota" if reason == "quota" else "rate_limit_exceeded"}},
+                            headers)
+
+    def _read_body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif path == "/stats":
+            self._send_json(200, self.behaviour.snapshot())
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {path}"}})
+
+    def do_DELETE(self):
+        # Gemini cached content is only ever deleted at exit.
+        self._send_json(200, {})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        try:
+            body = self._read_body()
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+            return
+        if path.endswith("/chat/completions"):
+            self._chat_completions(body)
+        elif path.endswith("/cachedContents"):
+            self._send_json(200, {"name": f"cachedContents/mock-{int(time.time() * 1000)}", "model": body.get("model")})
+        elif _GEMINI_PATH.search(path):
+            match = _GEMINI_PATH.search(path)
+            self._generate_content(body, match.group("model"), match.group("method") == "streamGenerateContent")
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {path}"}})
+
+    def _chat_completions(self, body: Dict[str, Any]):
+        key = self._api_key()
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+        rng = self.behaviour.rng(prompt)
+        self.behaviour.record(key, "requests")
+        reason = self.behaviour.rejection(key, rng)
+        if reason:
+            self._reject(False, reason, key)
+            return
+
+        model = body.get("model") or "mock"
+        pieces = self.behaviour.completion(prompt, body.get("max_completion_tokens") or body.get("max_tokens"), rng)
+        prompt_tokens, completion_tokens = _estimate_tokens(prompt), len(pieces)
+        self.behaviour.record(key, "prompt_tokens", prompt_tokens)
+        self.behaviour.record(key, "completion_tokens", completion_tokens)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        response_id, created = f"chatcmpl-mock-{rng.getrandbits(48):x}", int(time.time())
+
+        delay = self.behaviour.first_token_delay(rng)
+        if not body.get("stream"):
+            time.sleep(delay + (len(pieces) - 1) * self._interval())
+            text = "".join(pieces)
+            self._send_json(200, {
+                "id": response_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text.strip()},
+                             "finish_reason": "stop"}],
+                "usage": usage,
+            })
+            return
+
+        def chunk(delta, finish_reason=None):
+            return "data: " + json.dumps({
+                "id": response_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }) + "\n\n"
+
+        self._start_stream("text/event-stream")
+        try:
+            self._write_chunk(chunk({"role": "assistant", "content": ""}))
+            for piece in self._paced(pieces, delay):
+                self._write_chunk(chunk({"content": piece}))
+            self._write_chunk(chunk({}, "stop"))
+            self._write_chunk("data: [DONE]\n\n")
+            self._end_stream()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading, e.g. after an early stop on the refusal sentence.
+            self.behaviour.record(key, "cancelled")
+            self.close_connection = True
+
+    def _generate_content(self, body: Dict[str, Any], model: str, stream: bool):
+        key = self._api_key()
+        prompt = "\n".join(part.get("text", "") for content in body.get("contents", [])
+                           for part in content.get("parts", []))
+        rng = self.behaviour.rng(prompt)
+        self.behaviour.record(key, "requests")
+        reason = self.behaviour.rejection(key, rng)
+        if reason:
+            self._reject(True, reason, key)
+            return
+
+        config = body.get("generationConfig") or body.get("generation_config") or {}
+        pieces = self.behaviour.completion(prompt, config.get("maxOutputTokens") or config.get("max_output_tokens"), rng)
+        prompt_tokens = _estimate_tokens(prompt)
+        self.behaviour.record(key, "prompt_tokens", prompt_tokens)
+        self.behaviour.record(key, "completion_tokens", len(pieces))
+
+        def response(text, done, used):
+            candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+            if done:
+                candidate["finishReason"] = "STOP"
+            return {"candidates": [candidate], "modelVersion": model,
+                    "usageMetadata": {"promptTokenCount": prompt_tokens, "candidatesTokenCount": used,
+                                      "totalTokenCount": prompt_tokens + used}}
+
+        delay = self.behaviour.first_token_delay(rng)
+        if not stream:
+            time.sleep(delay + (len(pieces) - 1) * self._interval())
+            self._send_json(200, response("".join(pieces).strip(), True, len(pieces)))
+            return
+
+        # Gemini streams a few tokens per chunk, as SSE with alt=sse and as a JSON array otherwise.
+        sse = parse_qs(urlparse(self.path).query).get("alt") == ["sse"]
+        groups = [pieces[i:i + 4] for i in range(0, len(pieces), 4)]
+        self._start_stream("text/event-stream" if sse else "application/json")
+        try:
+            if not sse:
+                self._write_chunk("[")
+            used = 0
+            for i, group in enumerate(groups):
+                text = "".join(self._paced(group, delay if i == 0 else self._interval()))
+                used += len(group)
+                data = json.dumps(response(text, i == len(groups) - 1, used))
+                self._write_chunk(f"data: {data}\r\n\r\n" if sse else ("," if i else "") + data)
+            if not sse:
+                self._write_chunk("]")
+            self._end_stream()
+        except (BrokenPipeError, ConnectionResetError):
+            self.behaviour.record(key, "cancelled")
+            self.close_connection = True
+
+
+def make_server(behaviour: MockBehaviour, host: str = "127.0.0.1", port: int = 8000,
+                quiet: bool = True) -> ThreadingHTTPServer:
+    """A ThreadingHTTPServer for `behaviour`; port 0 picks a free port (see server.server_address)."""
+    handler = type("Handler", (MockHandler,), {"behaviour": behaviour, "quiet": quiet})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="islamqa mock", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="median time to first token")
+    parser.add_argument("--latency-dist", default="lognormal", choices=["fixed", "uniform", "exponential", "lognormal"])
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="lognormal shape; larger means a longer tail")
+    parser.add_argument("--tokens-per-second", type=float, default=100.0, help="output token rate, 0 for instant")
+    parser.add_argument("--output-tokens", type=int, default=64, help="upper bound on reply length")
+    parser.add_argument("--reply", help="always answer with this text, e.g. the refusal sentence")
+    parser.add_argument("--rpm", type=int, help="requests per minute allowed per API key")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--quota-keys", nargs="*", default=[], help="API keys whose quota is exhausted")
+    parser.add_argument("--retry-after", type=float, default=2.0, help="Retry-After seconds sent with every 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    behaviour = MockBehaviour(args.latency_ms, args.latency_dist, args.latency_sigma, args.tokens_per_second,
+                              args.output_tokens, args.reply, args.rpm, args.error_rate, tuple(args.quota_keys),
+                              args.retry_after, args.seed)
+    server = make_server(behaviour, args.host, args.port, quiet=not args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Mock LLM server on http://{host}:{port} (set LLM_BASE_URL=http://{host}:{port})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(behaviour.snapshot(), indent=2))
@@ -0,0 +1,93 @@
+import os
+from typing import Any, Dict, List
+
+from .prompts import GEMINI_PROMPT, GROUNDED_PROMPT, STRICT_PROMPT
+
+MERGED_DB_PATH = os.getenv("MERGED_DB_PATH", "Merged_DB")
+LOCAL_DB_PATH = os.getenv("FAISS_INDEX_PATH", "vectorDB")
+EMBEDDER_NAME = "sentence-transformers/all-mpnet-base-v2"
+GITHUB_ENDPOINT = "https://models.github.ai/inference"
+OPENROUTER_ENDPOINT = "https://openrouter.ai/api/v1"
+
+RAG_TEMPLATE = "Context:\n{context}\n\nUser Query: {question}"
+
+
+def numbered_keys(prefix: str, count: int) -> List[str]:
+    return [f"{prefix}_{i}" for i in range(1, count + 1)]
+
+
+# One entry per experiment. `keys` names the env vars holding API keys; entries
+# with an `index_path` answer from retrieved context, the rest from the question alone.
+MODELS: Dict[str, Dict[str, Any]] = {
+    "gemini": {
+        "provider": "gemini", "model": "gemini-2.5-flash",
+        "keys": ["gemini_api"], "output": "gemini.jsonl",
+    },
+    "gemini-rag": {
+        "provider": "gemini", "model": "gemini-2.5-flash", "temperature": 0.5, "max_tokens": 512,
+        "keys": numbered_keys("GEMINI_KEY", 6), "rpm": 10, "tpm": 250000,
+        "system_prompt": GEMINI_PROMPT,
+        "template": "### Retrieved Islamic Context:\n{context}\n\n### User Question:\n{question}"
+                    "\n\n### Answer (max 512 tokens):",
+        "index_path": MERGED_DB_PATH, "k": 5, "output": "gemini(rag).jsonl",
+    },
+    "deepseek": {
+        "provider": "groq", "model": "deepseek-r1-distill-llama-70b", "temperature": 0.7, "max_tokens": 512,
+        "keys": ["groq"], "output": "deepseek_v3_0324.jsonl",
+    },
+    "deepseek-rag": {
+        "provider": "groq", "model": "deepseek-r1-distill-llama-70b", "temperature": 0.5, "max_tokens": 512,
+        "keys": numbered_keys("GROQ_KEY", 5), "rpm": 30, "tpm": 6000,
+        "system_prompt": STRICT_PROMPT, "template": RAG_TEMPLATE,
+        "index_path": MERGED_DB_PATH, "k": 5, "output": "ds_r1_distill_llama_70b(rag).jsonl",
+    },
+    "llama-4": {
+        "provider": "groq", "model": "meta-llama/llama-4-maverick-17b-128e-instruct", "temperature": 0.7,
+        "max_tokens": 512, "keys": ["groq"], "output": "llama-4-maverick-17b-128e-instruct.jsonl",
+    },
+    "llama-4-rag": {
+        "provider": "groq", "model": "meta-llama/llama-4-maverick-17b-128e-instruct", "temperature": 0.5,
+        "max_tokens": 512, "keys": numbered_keys("GROQ_KEY", 5), "rpm": 30, "tpm": 6000,
+        "system_prompt": GROUNDED_PROMPT, "template": RAG_TEMPLATE,
+        "index_path": MERGED_DB_PATH, "k": 5, "output": "llama17b_maverick(rag).jsonl",
+    },
+    "gpt-4.1": {
+        "provider": "github", "model": "openai/gpt-4.1", "temperature": 0.7, "max_tokens": 512,
+        "keys": ["github_gpt_4.1"], "output": "gpt_4.1.jsonl",
+    },
+    "phi-4": {
+        "provider": "github", "model": "microsoft/Phi-4-reasoning", "temperature": 0.7, "max_tokens": 512,
+        "keys": ["github_phi"], "output": "phi4.jsonl",
+    },
+    "phi-4-rag": {
+        "provider": "github", "model": "microsoft/Phi-4-reasoning", "temperature": 0.5, "max_tokens": 512,
+        "keys": numbered_keys("PHI_KEY", 5), "rpm": 15,
+        "system_prompt": STRICT_PROMPT, "template": RAG_TEMPLATE,
+        "index_path": MERGED_DB_PATH, "k": 5, "output": "phi_rag.jsonl",
+    },
+    "deepseek-chimera": {
+        "provider": "openrouter", "model": "tngtech/deepseek-r1t2-chimera:free", "temperature": 0.7,
+        "keys": ["openrouter"], "output": "deepseek-r1t2-chimera.jsonl",
+    },
+    "mistral-7b": {
+        "provider": "huggingface", "model": "mistralai/Mistral-7B-Instruct-v0.1", "temperature": 0.7,
+        "max_tokens": 512, "keys": ["hf_hub_token"], "output": "mistral_7b_instruct_v0.1.jsonl",
+    },
+    "mistral-7b-rag": {
+        "provider": "local", "model": "mistralai/Mistral-7B-Instruct-v0.1", "temperature": 0.1, "max_tokens": 512,
+        # Mistral's chat template has no system role, so the instructions lead the user turn.
+        "template": GROUNDED_PROMPT + "\n\n" + RAG_TEMPLATE,
+        "index_path": MERGED_DB_PATH, "k": 5, "output": "mistral_7b(rag).jsonl",
+    },
+    "mixtral-rag": {
+        "provider": "groq", "model": "mixtral-8x7b-32768", "keys": ["groq"],
+        "template": "Context:\n{context}\n\nQuestion:\n{question}\n\nAnswer:",
+        "index_path": LOCAL_DB_PATH, "k": 10, "output": "rag_output.jsonl",
+    },
+}
+
+
+def get_model(name: str) -> Dict[str, Any]:
+    if name not in MODELS:
+        raise ValueError(f"Unknown model: {name} (available: {', '.join(MODELS)})")
+    return MODELS[name]
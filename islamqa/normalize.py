@@ -0,0 +1,62 @@
+import re
+from typing import Any, Iterable, List, Optional
+
+# Compared after lowercasing and symbol removal, so "<D>" and "<think>" (which
+# lose their brackets) never match; kept from the original list for identical output.
+STOPWORDS = frozenset({"narrated", "<d>", "<think>"})
+
+# Every pattern starts with a character class or a literal so the regex engine can
+# skip ahead instead of trying each position.
+_TO_SPACE = re.compile(r"[\n\r\\/\[\](){}]+")
+_SYMBOLS = re.compile(r"[^\w\s.,!?]+")
+_REPEATED_PUNCTUATION = re.compile(r"([.,!?])\1+")
+# Punctuation at either end of a word goes; inside a word ("3.5") it stays.
+_LEADING_PUNCTUATION = re.compile(r"(\s)[.,!?]+")
+_TRAILING_PUNCTUATION = re.compile(r"[.,!?]+(?!\S)")
+# Only stopwords that can survive symbol removal go in the pattern; a single literal keeps it fast.
+_STOPWORD_TOKENS = re.compile("|".join(rf"{re.escape(w)}(?<!\S{re.escape(w)})(?!\S)"
+                                       for w in sorted(STOPWORDS) if not _SYMBOLS.search(w)))
+
+
+def normalize(text: Any) -> Any:
+    """Lowercase, strip symbols and edge punctuation, drop stopwords and collapse whitespace.
+
+    Same output as the old ragas_eval.clean_text, as a fixed sequence of
+    precompiled substitutions with no per-token Python work. Lists are
+    normalized element by element; anything else that is not a string is
+    returned unchanged.
+    """
+    if isinstance(text, list):
+        return normalize_many(text)
+    if not isinstance(text, str):
+        return text
+    text = _SYMBOLS.sub("", _TO_SPACE.sub(" ", text.lower()))
+    text = _LEADING_PUNCTUATION.sub(r"\1", " " + _REPEATED_PUNCTUATION.sub(r"\1", text))
+    return " ".join(_STOPWORD_TOKENS.sub("", _TRAILING_PUNCTUATION.sub("", text)).split())
+
+
+def normalize_many(texts: Iterable[Any]) -> List[Any]:
+    # Texts are not joined into one string: a single wide character would make
+    # Python store all of it at 4 bytes per character and slow every pass.
+    return [normalize(text) for text in texts]
+
+
+def normalize_series(series):
+    """Normalize a pandas Series whose cells are strings, lists of strings or other values.
+
+    pandas' .str methods loop over the cells in Python as well and cannot see
+    into list cells such as RAGAS `contexts`, so this maps normalize() directly.
+    """
+    import pandas as pd
+
+    return pd.Series(normalize_many(series.tolist()), index=series.index, name=series.name, dtype=object)
+
+
+def normalize_frame(df, columns: Optional[Iterable[str]] = None):
+    """A copy of `df` with `columns` (default: every object column) normalized."""
+    df = df.copy()
+    if columns is None:
+        columns = df.select_dtypes(include=["object", "string"]).columns
+    for column in columns:
+        df[column] = normalize_series(df[column])
+    return df
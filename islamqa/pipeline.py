@@ -0,0 +1,85 @@
+from typing import Any, Dict, List, Optional
+
+from .generation import DEFAULT_CONCURRENCY, RESUME, read_records, record_question, run_generation
+from .models import EMBEDDER_NAME
+from .providers import call_model
+from .telemetry import span, trace
+
+
+def rag_retriever(index_path: str, k: int):
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    from .ann_index import load_vector_db
+    from .retrieval import make_retriever
+
+    embedding = HuggingFaceEmbeddings(model_name=EMBEDDER_NAME)
+    vector_db = load_vector_db(index_path, embedding)
+    return make_retriever(vector_db, index_path, k=k)
+
+
+def rag_messages(config: Dict[str, Any], question: str, context: str) -> List[Dict[str, str]]:
+    """The chat messages for one RAG question: the model's template filled in, after its system prompt if any."""
+    messages = [{"role": "user", "content": config["template"].format(context=context, question=question)}]
+    if config.get("system_prompt"):
+        messages.insert(0, {"role": "system", "content": config["system_prompt"]})
+    return messages
+
+
+def run_model(config: Dict[str, Any], input_file: str = "test.jsonl", output_file: Optional[str] = None,
+              limit: Optional[int] = 100, index_path: Optional[str] = None, k: Optional[int] = None,
+              concurrency: Optional[int] = None, resume: bool = RESUME) -> int:
+    """Answer every question in `input_file` with one configured model, with retrieval when it is a RAG model."""
+    output_file = output_file or config["output"]
+    index_path = index_path or config.get("index_path")
+    records = read_records(input_file, limit=limit)
+
+    if concurrency is None:
+        if config["provider"] == "local":
+            from .local_llm import BATCH_SIZE
+            # Twice the batch size in flight keeps the next batch queued while the current one runs.
+            concurrency = BATCH_SIZE * 2
+        else:
+            concurrency = DEFAULT_CONCURRENCY
+
+    if not index_path:
+        def generate(data):
+            question = record_question(data)
+            if not question:
+                return None
+            with trace(model=config["model"], question=question[:80]):
+                answer = call_model(config, [{"role": "user", "content": question}])
+            return {
+                "Question": question,
+                "Answer": data.get("Answer") or data.get("answer"),
+                "Document": data.get("Document") or data.get("document"),
+                "Generated_Answer": answer,
+            }
+
+        return run_generation(records, generate, output_file, concurrency, resume)
+
+    from .context_packing import ContextPacker
+
+    retriever = rag_retriever(index_path, k or config.get("k", 5))
+    packer = ContextPacker(config["model"])
+
+    def generate(data):
+        question = record_question(data)
+        if not question:
+            return None
+
+        with trace(model=config["model"], question=question[:80]):
+            # Prefetched questions were retrieved in a batch beforehand; this span is then just the lookup.
+            with span("retrieve"):
+                context = retriever.invoke(question)
+            with span("pack"):
+                packed = packer.pack(context)
+            answer = call_model(config, rag_messages(config, question, packed))
+
+        return {
+            "Question": question,
+            "Reference_Answer": data.get("Answer") or data.get("answer"),
+            "Generated_Answer": answer,
+            "Retrieved_Docs": [f"{doc.metadata.get('source')}" for doc in context],
+            "Retrieved_Texts": [doc.page_content for doc in context],
+        }
+
+    return run_generation(records, generate, output_file, concurrency, resume, prefetch=retriever.prefetch)
@@ -0,0 +1,51 @@
+from typing import Optional
+
+
+class GeminiModel:
+    """A Gemini model bound to one API key, with its system prompt sent as system_instruction.
+
+    genai.GenerativeModel sends every request through the process-wide client
+    that genai.configure() sets up, so concurrent calls on different keys
+    would all go out with one key. This builds the same request with the SDK's
+    public helpers and sends it through a GenerativeServiceClient of its own.
+    """
+
+    def __init__(self, client, model_name: str, system_prompt: Optional[str] = None):
+        self.client = client
+        self.model_name = model_name if "/" in model_name else f"models/{model_name}"
+        self.system_prompt = system_prompt
+
+    def generate_content(self, contents, stream: bool = False, generation_config=None):
+        from google.ai import generativelanguage as glm
+        from google.generativeai.types import content_types, generation_types
+
+        request = glm.GenerateContentRequest(
+            model=self.model_name,
+            contents=content_types.to_contents(contents),
+            generation_config=generation_types.to_generation_config_dict(generation_config or {}),
+            system_instruction=content_types.to_content(self.system_prompt) if self.system_prompt else None,
+        )
+        if request.contents and not request.contents[-1].role:
+            request.contents[-1].role = "user"
+        if stream:
+            return generation_types.GenerateContentResponse.from_iterator(self.client.stream_generate_content(request))
+        return generation_types.GenerateContentResponse.from_response(self.client.generate_content(request))
+
+
+def gemini_prefix_model(api_key: str, model_name: str, system_prompt: Optional[str],
+                        base_url: Optional[str] = None) -> GeminiModel:
+    """A GeminiModel for `api_key` that sends `system_prompt` ahead of every request.
+
+    The prompts here are well under the 1024 tokens Gemini needs for an
+    explicit context cache, so none is created: the system prompt and the
+    template's fixed instructions stay an identical leading prefix, which
+    Gemini's implicit caching bills at the cached rate once it recurs.
+    `base_url` switches the client to the REST transport against that server.
+    """
+    from google.ai import generativelanguage as glm
+
+    client_options, transport = {"api_key": api_key}, None
+    if base_url:
+        client_options["api_endpoint"], transport = base_url, "rest"
+    client = glm.GenerativeServiceClient(client_options=client_options, transport=transport)
+    return GeminiModel(client, model_name, system_prompt)
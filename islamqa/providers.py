@@ -0,0 +1,186 @@
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from .key_pool import KeyPool, estimate_tokens
+from .llm_cache import get_cache
+from .streaming import chat_completion, gemini_generate
+from .telemetry import count, span
+
+# Sends every provider to one server, e.g. `islamqa mock`; a model's own `base_url` takes precedence.
+BASE_URL = os.getenv("LLM_BASE_URL")
+
+_pools: Dict[str, KeyPool] = {}
+_local_llms: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def client_factory(config: Dict[str, Any]) -> Callable[[str], Any]:
+    """Builds the provider client for one API key; provider SDKs are imported only when first needed."""
+    provider = config["provider"]
+    base_url = config.get("base_url") or BASE_URL
+    if provider == "groq":
+        from groq import Groq
+        # The SDKs retry 429s on the same key by default; KeyPool has to see them to move to another key.
+        return lambda key: Groq(api_key=key, base_url=base_url, max_retries=0)
+    if provider in ("github", "openrouter"):
+        from openai import OpenAI
+        from .models import GITHUB_ENDPOINT, OPENROUTER_ENDPOINT
+        base_url = base_url or (GITHUB_ENDPOINT if provider == "github" else OPENROUTER_ENDPOINT)
+        return lambda key: OpenAI(api_key=key, base_url=base_url, max_retries=0)
+    if provider == "huggingface":
+        from huggingface_hub import InferenceClient
+        if base_url:
+            return lambda key: InferenceClient(base_url=base_url, token=key)
+        return lambda key: InferenceClient(model=config["model"], token=key)
+    if provider == "gemini":
+        from .prefix_cache import gemini_prefix_model
+        # One client per key; the system prompt leads every request so implicit caching can reuse it.
+        return lambda key: gemini_prefix_model(key, config["model"], config.get("system_prompt"), base_url=base_url)
+    raise ValueError(f"Unknown provider: {provider}")
+
+
+def get_pool(config: Dict[str, Any]) -> KeyPool:
+    pool_id = f"{config['provider']}:{config['model']}:{','.join(config['keys'])}"
+    with _lock:
+        if pool_id not in _pools:
+            _pools[pool_id] = KeyPool([os.getenv(name) for name in config["keys"]], client_factory(config),
+                                      rpm=config.get("rpm"), tpm=config.get("tpm"), name=config["provider"])
+        return _pools[pool_id]
+
+
+def _static_messages(config: Dict[str, Any]) -> List[Dict[str, str]]:
+    """The start every prompt for `config` shares: its system prompt and the template text before the first field."""
+    messages = [{"role": "user", "content": config.get("template", "").split("{", 1)[0]}]
+    if config.get("system_prompt"):
+        messages.insert(0, {"role": "system", "content": config["system_prompt"]})
+    return messages
+
+
+def _local_llm(config: Dict[str, Any]):
+    from .local_llm import LocalLLM
+    with _lock:
+        if config["model"] not in _local_llms:
+            # The shared instructions are encoded once and their KV cache reused for every prompt.
+            _local_llms[config["model"]] = LocalLLM(config["model"], max_new_tokens=config.get("max_tokens") or 512,
+                                                    temperature=config.get("temperature") or 0.0,
+                                                    prefix_messages=_static_messages(config))
+        return _local_llms[config["model"]]
+
+
+def _request(config: Dict[str, Any], messages: List[Dict[str, str]],
+             on_token: Optional[Callable[[str], None]] = None) -> Callable[[Any], str]:
+    provider = config["provider"]
+    temperature, max_tokens = config.get("temperature"), config.get("max_tokens")
+    if provider in ("groq", "github", "openrouter"):
+        options = {"temperature": temperature, "max_completion_tokens": max_tokens}
+        options = {name: value for name, value in options.items() if value is not None}
+        return lambda client: chat_completion(client, model=config["model"], messages=messages,
+                                              on_token=on_token, **options)
+    if provider == "huggingface":
+        def request(client):
+            response = client.chat_completion(
+                messages, max_tokens=max_tokens, temperature=temperature
+            ).choices[0].message.content.strip()
+            if on_token is not None:
+                on_token(response)
+            return response
+        return request
+    if provider == "gemini":
+        # The system message is part of the model (see client_factory); only the user turn is sent.
+        contents = [m["content"] for m in messages if m["role"] != "system"]
+        options = {"temperature": temperature, "max_output_tokens": max_tokens}
+        generation_config = {name: value for name, value in options.items() if value is not None}
+        return lambda model: gemini_generate(model, contents, on_token=on_token,
+                                             generation_config=generation_config or None).strip()
+    raise ValueError(f"Unknown provider: {provider}")
+
+
+class _AttemptStream:
+    """Forwards streamed chunks, calling `on_reset` before a retry that follows an attempt which streamed some."""
+
+    def __init__(self, on_token: Callable[[str], None], on_reset: Optional[Callable[[], None]]):
+        self.on_token = on_token
+        self.on_reset = on_reset
+        self.streamed = False
+
+    def token(self, chunk: str):
+        self.streamed = True
+        self.on_token(chunk)
+
+    def attempts(self, request: Callable[[Any], str]) -> Callable[[Any], str]:
+        def attempt(client):
+            if self.streamed:
+                self.streamed = False
+                if self.on_reset is not None:
+                    self.on_reset()
+            return request(client)
+        return attempt
+
+
+def call_model(config: Dict[str, Any], messages: List[Dict[str, str]],
+               on_token: Optional[Callable[[str], None]] = None,
+               on_reset: Optional[Callable[[], None]] = None) -> str:
+    """Answer `messages` with the configured model, through the response cache and the provider's key pool.
+
+    `on_token` receives the answer as it streams in; a cached or non-streaming
+    answer arrives as a single chunk. When an attempt fails after streaming
+    some chunks and the key pool retries, `on_reset` is called first: the
+    chunks received so far belong to the failed attempt and must be dropped.
+    """
+    temperature, max_tokens = config.get("temperature"), config.get("max_tokens")
+    provider, model = config["provider"], config["model"]
+    missed = False
+
+    def generate() -> str:
+        nonlocal missed
+        missed = True
+        prompt_tokens = estimate_tokens(messages)
+        with span("llm", provider=provider, model=model):
+            if provider == "local":
+                response = _local_llm(config).chat(messages)
+                if on_token is not None:
+                    on_token(response)
+            elif on_token is None:
+                response = get_pool(config).call(_request(config, messages),
+                                                 tokens=prompt_tokens + (max_tokens or 0))
+            else:
+                stream = _AttemptStream(on_token, on_reset)
+                response = get_pool(config).call(stream.attempts(_request(config, messages, stream.token)),
+                                                 tokens=prompt_tokens + (max_tokens or 0))
+        count("tokens_in", prompt_tokens, model=model)
+        count("tokens_out", estimate_tokens(response), model=model)
+        return response
+
+    if provider == "local":
+        from .local_llm import QUANTIZATION
+        cache_provider = f"local-{QUANTIZATION}"
+    else:
+        cache_provider = provider
+    response = get_cache().cached_call(cache_provider, model, messages, temperature, max_tokens, generate)
+    count("llm_cache", result="miss" if missed else "hit", model=model)
+    if not missed and on_token is not None:
+        on_token(response)
+    return response
+
+
+def check_keys(config: Dict[str, Any], prompt: str = "Say hello") -> int:
+    """Send `prompt` once with every configured key and report which ones work; returns the number that failed."""
+    if not config.get("keys"):
+        print(f"{config['model']}: provider {config['provider']!r} uses no API keys; nothing to check")
+        return 0
+    factory = client_factory(config)
+    request = _request(config, [{"role": "user", "content": prompt}])
+    failed = 0
+    for name in config["keys"]:
+        key = os.getenv(name)
+        if not key:
+            print(f"{name}: not set")
+            failed += 1
+            continue
+        try:
+            print(f"{name}: OK - {request(factory(key))[:60]!r}")
+        except Exception as e:
+            print(f"{name}: failed - {type(e).__name__}: {e}")
+            failed += 1
+    return failed
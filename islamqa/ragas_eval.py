@@ -0,0 +1,118 @@
+import os
+import json
+from typing import Any, Dict, List, Optional
+
+from .normalize import normalize_frame
+
+# Model that judges faithfulness, relevancy and context precision/recall.
+RAGAS_JUDGE_MODEL = os.getenv("RAGAS_JUDGE_MODEL", "gpt-4o-mini")
+# Judge calls in flight at once (RAGAS otherwise defaults to 16).
+RAGAS_CONCURRENCY = int(os.getenv("RAGAS_CONCURRENCY", "8"))
+# Judge responses keyed by a hash of the prompt and model settings; reruns only pay for new prompts.
+RAGAS_CACHE_PATH = os.getenv("RAGAS_CACHE_PATH", ".ragas_cache.sqlite")
+
+
+def load_jsonl(file_path):
+    with open(file_path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def record_contexts(record: Dict[str, Any]) -> List[str]:
+    """The passages behind one record's answer: its retrieved texts, or its own `<D>`-separated documents."""
+    contexts = record.get("Retrieved_Texts") or record.get("Reference") or record.get("Document") or []
+    if isinstance(contexts, str):
+        contexts = contexts.split("<D>")
+    return [c.strip() for c in contexts if c and c.strip()]
+
+def build_rows(candidate: List[Dict[str, Any]], reference: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """RAGAS rows from a model output file; with `reference`, questions and answers come from the test set.
+
+    Every row carries only its own record's contexts.
+    """
+    combined_data = []
+    if reference is None:
+        for cand in candidate:
+            ground_truth = cand.get("Answer") or cand.get("Reference_Answer")
+            if not ground_truth:
+                continue
+            combined_data.append({
+                "question": cand["Question"],
+                "answer": cand["Generated_Answer"],
+                "contexts": record_contexts(cand),
+                "ground_truth": ground_truth
+            })
+    else:
+        for ref, cand in zip(reference, candidate):
+            if not ref.get("Answer"):
+                continue
+            combined_data.append({
+                "question": ref["Question"],
+                "answer": cand.get("Answer") or cand.get("Generated_Answer"),
+                "contexts": record_contexts(cand),
+                "ground_truth": ref["Answer"]
+            })
+    return combined_data
+
+def judge_llm(model: str = RAGAS_JUDGE_MODEL, cache_path: str = RAGAS_CACHE_PATH):
+    """The RAGAS judge, with every response cached on disk by LangChain's prompt-keyed LLM cache."""
+    from langchain_community.cache import SQLiteCache
+    from langchain_core.globals import set_llm_cache
+    from langchain_openai import ChatOpenAI
+    from ragas.llms import LangchainLLMWrapper
+    from .providers import BASE_URL
+
+    if cache_path:
+        set_llm_cache(SQLiteCache(database_path=cache_path))
+    return LangchainLLMWrapper(ChatOpenAI(model=model, api_key=os.getenv("openai_api"), base_url=BASE_URL))
+
+def judge_embeddings():
+    from langchain_openai import OpenAIEmbeddings
+    from ragas.embeddings import LangchainEmbeddingsWrapper
+    from .providers import BASE_URL
+
+    return LangchainEmbeddingsWrapper(OpenAIEmbeddings(api_key=os.getenv("openai_api"), base_url=BASE_URL))
+
+def evaluate_ragas(file_path: str, reference_path: Optional[str] = None, clean: bool = True,
+                   metrics: Optional[List[Any]] = None, concurrency: int = RAGAS_CONCURRENCY):
+    import openai
+    import pandas as pd
+    from datasets import Dataset
+    from dotenv import load_dotenv
+    from ragas import RunConfig, evaluate
+    from ragas.metrics import (
+        faithfulness,
+        answer_relevancy,
+        context_precision,
+        context_recall,
+        # context_relevancy,
+    )
+
+    load_dotenv()
+    openai.api_key = os.getenv("openai_api")
+
+    reference = load_jsonl(reference_path) if reference_path else None
+    df = pd.DataFrame(build_rows(load_jsonl(file_path), reference))
+    if clean:
+        df = normalize_frame(df)
+    dataset = Dataset.from_pandas(df)
+
+    results = evaluate(
+        dataset,
+        metrics=metrics or [
+            faithfulness,
+            answer_relevancy,
+            context_precision,
+            context_recall,
+            # context_relevancy,
+        ],
+        llm=judge_llm(),
+        embeddings=judge_embeddings(),
+        run_config=RunConfig(max_workers=concurrency),
+    )
+    df = results.to_pandas()
+    average_scores = df.mean(numeric_only=True)
+    print("Average Scores:")
+    print(average_scores)
+
+    print("RAGAS Metrics:")
+    print(results)
+    return results
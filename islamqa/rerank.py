@@ -0,0 +1,62 @@
+import os
+from typing import List, Tuple
+
+from langchain_core.documents import Document
+
+from .llm_cache import ResponseCache, cache_key
+from .retrieval import BatchRetriever
+from .telemetry import span
+
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_FETCH_K = int(os.getenv("RERANK_FETCH_K", "20"))
+RERANK_CACHE_PATH = os.getenv("RERANK_CACHE_PATH", ".rerank_cache.sqlite")
+
+
+class CrossEncoderReranker:
+    """Scores (question, chunk) pairs with a small cross-encoder, caching every score on disk."""
+
+    def __init__(self, model_name: str = RERANK_MODEL, cache_path: str = RERANK_CACHE_PATH, batch_size: int = 64):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache = ResponseCache(cache_path)
+        self.model = None
+
+    def score(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        keys = [cache_key("cross-encoder", self.model_name, list(pair), None, None) for pair in pairs]
+        cached = self.cache.get_many(keys)
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        if missing:
+            if self.model is None:
+                from sentence_transformers import CrossEncoder
+                self.model = CrossEncoder(self.model_name, device="cpu")
+            # All uncached pairs go through the model in one batched predict call.
+            scores = self.model.predict([pairs[i] for i in missing], batch_size=self.batch_size)
+            computed = {keys[i]: repr(float(s)) for i, s in zip(missing, scores)}
+            self.cache.set_many(computed)
+            cached.update(computed)
+        return [float(cached[key]) for key in keys]
+
+    def rerank(self, questions: List[str], candidates: List[List[Document]], top_n: int) -> List[List[Document]]:
+        pairs = [(question, doc.page_content) for question, docs in zip(questions, candidates) for doc in docs]
+        scores = iter(self.score(pairs))
+        results = []
+        for docs in candidates:
+            scored = sorted(((next(scores), i) for i in range(len(docs))), reverse=True)
+            results.append([docs[i] for _, i in scored[:top_n]])
+        return results
+
+
+class RerankingRetriever(BatchRetriever):
+    """Over-fetches `fetch_k` candidates from `base` and keeps the `k` the cross-encoder scores highest."""
+
+    def __init__(self, base: BatchRetriever, k: int = 5, fetch_k: int = RERANK_FETCH_K,
+                 reranker: CrossEncoderReranker = None):
+        super().__init__(base.vector_db, k)
+        self.base = base
+        self.base.k = max(fetch_k, k)
+        self.reranker = reranker or CrossEncoderReranker()
+
+    def retrieve_batch(self, questions: List[str]) -> List[List[Document]]:
+        candidates = self.base.retrieve_batch(questions)
+        with span("rerank"):
+            return self.reranker.rerank(questions, candidates, self.k)
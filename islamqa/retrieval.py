@@ -0,0 +1,120 @@
+import os
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from .generation import record_question
+from .telemetry import span
+
+# "dense" (FAISS only) or "hybrid" (BM25 + FAISS with reciprocal-rank fusion).
+RETRIEVER = os.getenv("RETRIEVER", "dense")
+# Rerank the retrieved candidates with a cross-encoder (see rerank.py).
+RERANK = os.getenv("RERANK", "0") == "1"
+# Comma-separated source_type filter, e.g. "Quran" or "Sahih Bukhari,Sahih Muslim".
+SOURCE_TYPES = [s.strip() for s in os.getenv("SOURCE_TYPES", "").split(",") if s.strip()] or None
+
+
+def embed_questions(vector_db, questions: List[str]) -> np.ndarray:
+    # all-mpnet-base-v2 encodes queries and passages alike (HuggingFaceEmbeddings.embed_query is
+    # embed_documents([text])[0]), so every question goes through one batched embed_documents call.
+    embeddings = vector_db.embeddings
+    with span("embed"):
+        if embeddings is not None:
+            vectors = embeddings.embed_documents(questions)
+        else:
+            vectors = [vector_db.embedding_function(question) for question in questions]
+        vectors = np.asarray(vectors, dtype=np.float32)
+    if vector_db._normalize_L2:
+        import faiss
+        faiss.normalize_L2(vectors)
+    return vectors
+
+
+def docs_at(vector_db, positions: Iterable[int]) -> List[Document]:
+    docs = []
+    with span("docstore"):
+        for i in positions:
+            if i == -1:
+                continue
+            doc = vector_db.docstore.search(vector_db.index_to_docstore_id[int(i)])
+            if isinstance(doc, Document):
+                docs.append(doc)
+    return docs
+
+
+def batch_retrieve(vector_db, questions: List[str], k: int) -> List[List[Document]]:
+    """Top-k documents for every question from one encoder pass and one FAISS search."""
+    if not questions:
+        return []
+    vectors = embed_questions(vector_db, questions)
+    with span("search"):
+        _, indices = vector_db.index.search(vectors, k)
+    return [docs_at(vector_db, row) for row in indices]
+
+
+class BatchRetriever:
+    """Drop-in for `vector_db.as_retriever()` that retrieves questions in batches.
+
+    `prefetch` wraps a record stream and retrieves each block of questions with
+    `retrieve_batch`; `invoke` then hands out the prefetched documents, dropping
+    them once used, and only searches on its own for questions that were not
+    prefetched. Filter the stream (e.g. for resume) before prefetching it.
+    """
+
+    def __init__(self, vector_db, k: int = 5):
+        self.vector_db = vector_db
+        self.k = k
+        self.prefetched: Dict[str, List[Document]] = {}
+
+    def retrieve_batch(self, questions: List[str]) -> List[List[Document]]:
+        return batch_retrieve(self.vector_db, questions, self.k)
+
+    def prefetch(self, records: Iterable[Tuple[int, Dict[str, Any]]],
+                 batch_size: int = 64) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        block = []
+        for item in records:
+            block.append(item)
+            if len(block) >= batch_size:
+                yield from self._prefetch_block(block)
+                block = []
+        yield from self._prefetch_block(block)
+
+    def _prefetch_block(self, block):
+        questions = list({q for q in (record_question(data) for _, data in block) if q})
+        for question, docs in zip(questions, self.retrieve_batch(questions)):
+            self.prefetched[question] = docs
+        return block
+
+    def invoke(self, question: str) -> List[Document]:
+        docs = self.prefetched.pop(question, None)
+        if docs is None:
+            docs = self.retrieve_batch([question])[0]
+        return docs
+
+    get_relevant_documents = invoke
+
+
+def make_retriever(vector_db, index_path, k: int = 5, kind: str = RETRIEVER, rerank: bool = RERANK,
+                   source_types: Optional[Sequence[str]] = SOURCE_TYPES) -> BatchRetriever:
+    """Build the configured retriever; RERANK=1 adds a cross-encoder rerank stage on top.
+
+    With `source_types`, dense search runs only over those collections' shards.
+    """
+    if kind == "hybrid":
+        if source_types:
+            raise ValueError("source_types filtering is only supported by the dense retriever")
+        from .hybrid import HybridRetriever
+        retriever = HybridRetriever(vector_db, index_path, k=k)
+    elif kind == "dense" and source_types:
+        from .shards import ShardedRetriever
+        retriever = ShardedRetriever(vector_db, index_path, k=k, source_types=source_types)
+    elif kind == "dense":
+        retriever = BatchRetriever(vector_db, k=k)
+    else:
+        raise ValueError(f"Unknown retriever: {kind} (expected 'dense' or 'hybrid')")
+
+    if rerank:
+        from .rerank import RerankingRetriever
+        retriever = RerankingRetriever(retriever, k=k)
+    return retriever
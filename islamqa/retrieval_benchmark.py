@@ -0,0 +1,252 @@
+"""Offline retrieval benchmark over labeled questions.
+
+Builds a small index from fixture CSVs generated out of the questions' own
+`Document` passages (shaped like sahih_bukhari.csv and merged_quran.csv, plus
+optional synthetic distractor rows), then reports build time, memory,
+per-query latency, QPS under N threads and recall@k for each retriever.
+The gold passages are what the original mpnet retriever returned, so recall
+measures agreement with it; `--embedder hash` is for timing only.
+
+    islamqa bench --questions test.jsonl --json bench.json
+    islamqa bench --questions deepseek_r1_distill_llama_70b.jsonl --embedder hash --distractors 5000
+"""
+import os
+import re
+import csv
+import json
+import time
+import random
+import shutil
+import zlib
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from .generation import read_records, record_question
+
+PASSAGE_SEPARATOR = "<D>"
+PROBE_CHARS = 80
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_TOKEN = re.compile(r"\w+")
+
+
+class HashingEmbeddings(Embeddings):
+    """Bag-of-words feature hashing; needs no model download, for timing runs on machines without one."""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.model_name = f"hashing-{dim}"
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in _TOKEN.findall(text.lower()):
+            vector[zlib.crc32(token.encode("utf-8")) % self.dim] += 1.0
+        vector = np.log1p(vector)
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def _normalize(text: str) -> str:
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def load_labeled_questions(path: str, limit: Optional[int]) -> List[Tuple[str, List[str]]]:
+    """(question, gold passages) for every record with a `Document` field."""
+    labeled = []
+    for _, data in read_records(path, limit):
+        question = record_question(data)
+        document = data.get("Document") or data.get("document")
+        if question and document:
+            passages = [p.strip() for p in document.split(PASSAGE_SEPARATOR) if p.strip()]
+            labeled.append((question, passages))
+    return labeled
+
+
+def write_fixtures(labeled: List[Tuple[str, List[str]]], workdir: str, distractors: int = 0,
+                   seed: int = 0) -> List[Dict[str, Any]]:
+    """Write hadith and Quran fixture CSVs holding every gold passage plus `distractors` shuffled rows."""
+    passages = list(dict.fromkeys(p for _, gold in labeled for p in gold))
+    rng = random.Random(seed)
+    words = [p.split() for p in passages]
+    for _ in range(distractors):
+        source = rng.choice(words)
+        passages.append(" ".join(rng.sample(source, len(source))))
+
+    # Tafsir passages open with the quoted verse in parentheses; everything else is hadith.
+    quran = [p for p in passages if p.startswith("(")]
+    hadith = [p for p in passages if not p.startswith("(")]
+    configs = [
+        {"path": os.path.join(workdir, "sahih_bukhari.csv"), "source_column": "hadithEnglish",
+         "source_type": "Sahih Bukhari", "encoding": "utf-8", "rows": hadith},
+        {"path": os.path.join(workdir, "merged_quran.csv"), "source_column": "Ayah Translation",
+         "source_type": "Quran", "encoding": "utf-8", "rows": quran},
+    ]
+    for config in configs:
+        with open(config["path"], 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["id", config["source_column"]])
+            writer.writerows(enumerate(config.pop("rows")))
+    return configs
+
+
+def _chunk_body(text: str) -> str:
+    # CSVLoader chunks start with "column: value" lines; the longest value is the passage text.
+    values = [line.split(": ", 1)[1] for line in text.splitlines() if ": " in line]
+    return max(values, key=len) if values else text
+
+
+def passage_hit(passage: str, chunk: str) -> bool:
+    passage, body, chunk = _normalize(passage), _normalize(_chunk_body(chunk)), _normalize(chunk)
+    return passage[:PROBE_CHARS] in chunk or (len(body) >= 20 and body[:PROBE_CHARS] in passage)
+
+
+def recall_at_k(labeled: List[Tuple[str, List[str]]], retrieved: List[List[Any]]) -> float:
+    """Mean fraction of each question's gold passages that some retrieved chunk matches."""
+    scores = []
+    for (_, gold), docs in zip(labeled, retrieved):
+        hits = sum(any(passage_hit(p, doc.page_content) for doc in docs) for p in gold)
+        scores.append(hits / len(gold))
+    return float(np.mean(scores)) if scores else 0.0
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status", 'r') as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def measure(retriever, labeled, threads: List[int], repeat: int) -> Dict[str, Any]:
+    questions = [q for q, _ in labeled]
+    retriever.retrieve_batch(questions[:1])
+
+    latencies, retrieved = [], []
+    for question in questions:
+        start = time.perf_counter()
+        retrieved.append(retriever.retrieve_batch([question])[0])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    qps = {}
+    workload = questions * repeat
+    for n in threads:
+        with ThreadPoolExecutor(n) as pool:
+            start = time.perf_counter()
+            list(pool.map(lambda q: retriever.retrieve_batch([q]), workload))
+            qps[str(n)] = len(workload) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    retriever.retrieve_batch(questions)
+    batch_qps = len(questions) / (time.perf_counter() - start)
+
+    return {
+        f"recall@{retriever.k}": recall_at_k(labeled, retrieved),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "qps": qps,
+        "batch_qps": batch_qps,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="islamqa bench", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", default="test.jsonl", help="JSONL with Question and Document fields")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--embedder", default="sentence-transformers/all-mpnet-base-v2",
+                        help="a locally cached sentence-transformers model, or 'hash'")
+    parser.add_argument("--distractors", type=int, default=0, help="extra shuffled rows to grow the corpus")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--index-types", nargs="+", default=["flat", "hnsw", "ivf_flat"])
+    parser.add_argument("--retrievers", nargs="+", default=["dense", "hybrid"], choices=["dense", "hybrid"])
+    parser.add_argument("--threads", nargs="+", type=int, default=[1, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the questions for the QPS runs")
+    parser.add_argument("--workers", type=int, default=0, help="ingest processes (default: INGEST_WORKERS)")
+    parser.add_argument("--workdir", help="keep fixtures and index here instead of a temporary directory")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    # Everything must come from local files; never reach out to the Hugging Face Hub.
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+    from .ann_index import use_index_type
+    from .docstore import load_faiss, save_vector_db
+    from .ingest import WORKERS, build_vector_db
+    from .retrieval import make_retriever
+
+    labeled = load_labeled_questions(args.questions, args.limit)
+    if not labeled:
+        raise SystemExit(f"No questions with a Document field in {args.questions}")
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="islamqa-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    index_path = os.path.join(workdir, "index")
+    try:
+        configs = write_fixtures(labeled, workdir, args.distractors)
+        if args.embedder == "hash":
+            embeddings = HashingEmbeddings()
+        else:
+            from langchain_community.embeddings import HuggingFaceEmbeddings
+            embeddings = HuggingFaceEmbeddings(model_name=args.embedder)
+
+        rss_before = rss_mb()
+        start = time.perf_counter()
+        vector_db, _ = build_vector_db(configs, embeddings, args.workers or WORKERS)
+        build_s = time.perf_counter() - start
+        if os.path.exists(index_path):
+            shutil.rmtree(index_path)
+        save_vector_db(vector_db, index_path)
+        corpus = {
+            "questions": len(labeled),
+            "rows": sum(1 for config in configs for _ in open(config["path"], encoding="utf-8")) - len(configs),
+            "chunks": vector_db.index.ntotal,
+            "embedder": embeddings.model_name,
+            "build_s": build_s,
+            "flat_index_mb": os.path.getsize(os.path.join(index_path, "index.faiss")) / 2 ** 20,
+        }
+
+        results = []
+        for index_type in args.index_types:
+            vector_db = load_faiss(index_path, embeddings)
+            start = time.perf_counter()
+            vector_db = use_index_type(vector_db, index_path, index_type)
+            index_build_s = time.perf_counter() - start
+            for kind in args.retrievers:
+                start = time.perf_counter()
+                retriever = make_retriever(vector_db, index_path, k=args.k, kind=kind, rerank=False, source_types=None)
+                retriever_build_s = time.perf_counter() - start
+                result = {"index_type": index_type, "retriever": kind, "k": args.k,
+                          "index_build_s": index_build_s, "retriever_build_s": retriever_build_s}
+                result.update(measure(retriever, labeled, args.threads, args.repeat))
+                result["rss_mb"] = rss_mb()
+                results.append(result)
+        corpus["rss_growth_mb"] = rss_mb() - rss_before
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"\n{corpus['chunks']} chunks from {corpus['rows']} rows, {corpus['questions']} questions, "
+          f"embedder {corpus['embedder']}, built in {corpus['build_s']:.1f}s")
+    qps_header = " ".join(f"{'qps@' + str(n):>9}" for n in args.threads)
+    print(f"{'index':<9} {'retriever':<9} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {qps_header} {'batch qps':>10}")
+    for r in results:
+        qps = " ".join(f"{r['qps'][str(n)]:>9.0f}" for n in args.threads)
+        print(f"{r['index_type']:<9} {r['retriever']:<9} {r[f'recall@{args.k}']:>7.3f} {r['p50_ms']:>8.2f} "
+              f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {qps} {r['batch_qps']:>10.0f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "cpu_count": os.cpu_count(),
+                       "corpus": corpus, "results": results}, f, indent=2)
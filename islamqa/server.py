@@ -0,0 +1,362 @@
+"""Long-running RAG service with the index and embedder loaded once.
+
+    islamqa serve --port 8080
+    curl -N localhost:8080/ask -d '{"question": "What breaks the fast?", "model": "deepseek-rag"}'
+    curl 'localhost:8080/retrieve?q=What+breaks+the+fast%3F'
+
+POST /ask answers with one of the served RAG models (the first --model by
+default) and streams server-sent events: a "sources" event with the retrieved
+chunks, a "token" event per chunk of the answer as it arrives, then "done"
+with the full answer ("error" if the model call failed). A "reset" event means
+the provider failed partway through and the answer is being retried on
+another API key: drop the tokens received so far. Send "stream": false
+for a single JSON response instead. GET or POST /retrieve returns the chunks
+only; POST accepts "questions" for several at once.
+
+Concurrent queries are grouped into micro-batches: a batch collects for up to
+--window-ms, then goes through one embedding pass and one FAISS search. GET
+/health reports the batch sizes and GET /metrics the pipeline telemetry in
+Prometheus text format.
+"""
+import os
+import json
+import asyncio
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+from aiohttp.log import access_logger
+from langchain_core.documents import Document
+
+from .telemetry import count, get_telemetry, span, trace
+
+SERVE_WINDOW_MS = float(os.getenv("SERVE_WINDOW_MS", "5"))
+SERVE_MAX_BATCH = int(os.getenv("SERVE_MAX_BATCH", "64"))
+# Threads for model calls; each one is held for the whole (rate-limited, streamed) provider request.
+SERVE_LLM_WORKERS = int(os.getenv("SERVE_LLM_WORKERS", "64"))
+
+
+class MicroBatcher:
+    """Groups concurrent `retrieve` calls into one `retrieve_batch` call on the retriever.
+
+    The first question of a batch waits up to `window` seconds for others to
+    join, up to `max_batch` in all; repeated questions are retrieved once.
+    Batches run one at a time on a single thread, and questions that arrive
+    meanwhile make up the next batch, so batches grow with load without any
+    extra wait.
+    """
+
+    def __init__(self, retriever, window: float = SERVE_WINDOW_MS / 1000, max_batch: int = SERVE_MAX_BATCH):
+        self.retriever = retriever
+        self.window = window
+        self.max_batch = max_batch
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="retrieve")
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.questions = 0
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+        self.executor.shutdown(wait=False)
+
+    async def retrieve(self, question: str) -> List[Document]:
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((question, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        pending = [await self.queue.get()]
+        if self.queue.qsize() < self.max_batch - 1:
+            await asyncio.sleep(self.window)
+        while len(pending) < self.max_batch and not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+        # Requests whose client went away while waiting are not retrieved.
+        return [(question, future) for question, future in pending if not future.done()]
+
+    def _retrieve(self, questions: List[str]) -> List[List[Document]]:
+        with span("retrieve_batch"):
+            return self.retriever.retrieve_batch(questions)
+
+    async def _loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = await self._collect()
+            if not pending:
+                continue
+            questions = list(dict.fromkeys(question for question, _ in pending))
+            try:
+                results = dict(zip(questions, await loop.run_in_executor(self.executor, self._retrieve, questions)))
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.questions += len(pending)
+            count("retrieve_batch_questions", len(pending))
+            for question, future in pending:
+                if not future.done():
+                    future.set_result(results[question])
+
+
+def _document(doc: Document) -> Dict[str, Any]:
+    return {"source": doc.metadata.get("source"), "text": doc.page_content, "metadata": doc.metadata}
+
+
+class RagService:
+    """The warm retriever, context packers and model configs behind the HTTP endpoints."""
+
+    def __init__(self, retriever, models: Dict[str, Dict[str, Any]], window: float = SERVE_WINDOW_MS / 1000,
+                 max_batch: int = SERVE_MAX_BATCH, llm_workers: int = SERVE_LLM_WORKERS):
+        from .context_packing import ContextPacker
+
+        if not models:
+            raise ValueError("At least one model is needed to serve /ask")
+        self.retriever = retriever
+        self.models = models
+        self.default_model = next(iter(models))
+        # Packers load their tokenizers now rather than on the first question.
+        self.packers = {name: ContextPacker(config["model"]) for name, config in models.items()}
+        self.batcher = MicroBatcher(retriever, window, max_batch)
+        self.llm_pool = ThreadPoolExecutor(llm_workers, thread_name_prefix="llm")
+
+    async def retrieve(self, question: str, k: Optional[int] = None) -> List[Document]:
+        docs = await self.batcher.retrieve(question)
+        return docs[:k] if k else docs
+
+    def _answer(self, name: str, question: str, docs: List[Document], on_token, on_reset) -> str:
+        from .pipeline import rag_messages
+        from .providers import call_model
+
+        config = self.models[name]
+        with trace(model=config["model"], question=question[:80]):
+            with span("pack"):
+                packed = self.packers[name].pack(docs)
+            return call_model(config, rag_messages(config, question, packed), on_token=on_token, on_reset=on_reset)
+
+    def answer(self, name: str, question: str, docs: List[Document], on_token=None, on_reset=None) -> asyncio.Future:
+        """Run the model call on the LLM pool; `on_token` and `on_reset` (see call_model) are called on the event loop."""
+        loop = asyncio.get_running_loop()
+
+        def on_loop(callback):
+            if callback is None:
+                return None
+            return lambda *args: loop.call_soon_threadsafe(callback, *args)
+
+        return loop.run_in_executor(self.llm_pool, self._answer, name, question, docs,
+                                    on_loop(on_token), on_loop(on_reset))
+
+    async def start(self, app: web.Application):
+        await self.batcher.start()
+
+    async def stop(self, app: web.Application):
+        await self.batcher.stop()
+        self.llm_pool.shutdown(wait=False)
+
+
+SERVICE = web.AppKey("service", RagService)
+# Queued between a failed attempt's chunks and the retry's.
+_RESET = object()
+
+
+async def _read_json(request: web.Request) -> Dict[str, Any]:
+    if not request.can_read_body:
+        return {}
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        raise web.HTTPBadRequest(text=json.dumps({"error": "Body is not valid JSON"}), content_type="application/json")
+    if not isinstance(body, dict):
+        raise web.HTTPBadRequest(text=json.dumps({"error": "Body must be a JSON object"}),
+                                 content_type="application/json")
+    return body
+
+
+def _bad_request(message: str) -> web.Response:
+    return web.json_response({"error": message}, status=400)
+
+
+def _k(value: Any, limit: int) -> Optional[int]:
+    """A requested `k`, at most the `limit` the retriever was loaded with; ValueError unless a positive integer."""
+    if value in (None, ""):
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(value)
+    k = int(value)
+    if k < 1:
+        raise ValueError(value)
+    return min(k, limit)
+
+
+async def _retrieve(request: web.Request) -> web.Response:
+    service: RagService = request.app[SERVICE]
+    body = await _read_json(request) if request.method == "POST" else dict(request.query)
+    questions = body["questions"] if "questions" in body else [body.get("question") or body.get("q")]
+    if not isinstance(questions, list) or not questions:
+        return _bad_request("'questions' must be a non-empty list of questions")
+    if not all(isinstance(question, str) and question.strip() for question in questions):
+        return _bad_request("Send a non-empty 'question' (or 'q'), or a list of 'questions'")
+    try:
+        k = _k(body.get("k"), service.retriever.k)
+    except ValueError:
+        return _bad_request("'k' must be a positive integer")
+
+    count("server_requests", endpoint="retrieve")
+    results = await asyncio.gather(*(service.retrieve(question.strip(), k) for question in questions))
+    results = [{"question": question, "documents": [_document(doc) for doc in docs]}
+               for question, docs in zip(questions, results)]
+    return web.json_response(results if "questions" in body else results[0])
+
+
+async def _ask(request: web.Request) -> web.StreamResponse:
+    service: RagService = request.app[SERVICE]
+    body = await _read_json(request)
+    question = body.get("question")
+    if not isinstance(question, str) or not question.strip():
+        return _bad_request("Send a non-empty 'question'")
+    name = body.get("model") or service.default_model
+    if name not in service.models:
+        return _bad_request(f"Unknown model {name!r}; this server answers with {', '.join(service.models)}")
+    try:
+        k = _k(body.get("k"), service.retriever.k)
+    except ValueError:
+        return _bad_request("'k' must be a positive integer")
+
+    count("server_requests", endpoint="ask")
+    question = question.strip()
+    docs = await service.retrieve(question, k)
+    sources = [_document(doc) for doc in docs]
+
+    if not body.get("stream", True):
+        try:
+            answer = await service.answer(name, question, docs)
+        except Exception as e:
+            return web.json_response({"error": f"{type(e).__name__}: {e}"}, status=502)
+        return web.json_response({"question": question, "model": name, "answer": answer, "sources": sources})
+
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+    await response.prepare(request)
+
+    async def send(event: str, data: Dict[str, Any]):
+        await response.write(f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8"))
+
+    chunks: asyncio.Queue = asyncio.Queue()
+    future = service.answer(name, question, docs, on_token=chunks.put_nowait,
+                            on_reset=lambda: chunks.put_nowait(_RESET))
+    # Scheduled after every chunk the model thread handed over, so None always comes last.
+    future.add_done_callback(lambda _: chunks.put_nowait(None))
+    try:
+        await send("sources", {"question": question, "model": name, "sources": sources})
+        while True:
+            chunk = await chunks.get()
+            if chunk is None:
+                break
+            if chunk is _RESET:
+                await send("reset", {})
+            else:
+                await send("token", {"text": chunk})
+        try:
+            answer = await future
+        except Exception as e:
+            await send("error", {"error": f"{type(e).__name__}: {e}"})
+        else:
+            await send("done", {"answer": answer})
+    except ConnectionResetError:
+        # The client left; the model call still finishes in its thread and its answer is cached.
+        count("server_disconnects")
+    return response
+
+
+async def _health(request: web.Request) -> web.Response:
+    service: RagService = request.app[SERVICE]
+    batcher = service.batcher
+    return web.json_response({
+        "status": "ok",
+        "vectors": service.retriever.vector_db.index.ntotal,
+        "k": service.retriever.k,
+        "models": list(service.models),
+        "batches": batcher.batches,
+        "questions": batcher.questions,
+        "mean_batch": batcher.questions / batcher.batches if batcher.batches else 0.0,
+    })
+
+
+async def _metrics(request: web.Request) -> web.Response:
+    return web.Response(text=get_telemetry().prometheus(), content_type="text/plain")
+
+
+def make_app(service: RagService) -> web.Application:
+    app = web.Application()
+    app[SERVICE] = service
+    app.router.add_get("/retrieve", _retrieve)
+    app.router.add_post("/retrieve", _retrieve)
+    app.router.add_post("/ask", _ask)
+    app.router.add_get("/health", _health)
+    app.router.add_get("/metrics", _metrics)
+    app.on_startup.append(service.start)
+    app.on_cleanup.append(service.stop)
+    return app
+
+
+def load_service(model_names: Sequence[str], index_path: Optional[str] = None, k: Optional[int] = None,
+                 window: float = SERVE_WINDOW_MS / 1000, max_batch: int = SERVE_MAX_BATCH,
+                 llm_workers: int = SERVE_LLM_WORKERS) -> RagService:
+    """Load the embedder and index once, for RAG models that all share that index."""
+    from .models import MODELS, get_model
+    from .pipeline import rag_retriever
+
+    if not model_names:
+        index_path = index_path or MODELS["gemini-rag"]["index_path"]
+        model_names = [name for name, config in MODELS.items() if config.get("index_path") == index_path]
+    models = {name: get_model(name) for name in model_names}
+    for name, config in models.items():
+        if not config.get("index_path"):
+            raise ValueError(f"{name} is not a RAG model; only models with an index_path can be served")
+    index_paths = {config["index_path"] for config in models.values()}
+    if index_path is None and len(index_paths) > 1:
+        raise ValueError(f"The models use different indexes ({', '.join(sorted(index_paths))}); "
+                         f"pass --index-path to serve them all from one")
+    index_path = index_path or index_paths.pop()
+
+    retriever = rag_retriever(index_path, k or max(config.get("k", 5) for config in models.values()))
+    # The first encoder pass is much slower than the rest; pay for it before taking traffic.
+    retriever.retrieve_batch(["warm up"])
+    return RagService(retriever, models, window, max_batch, llm_workers)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="islamqa serve", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--model", action="append", dest="models", default=[],
+                        help="RAG model to serve, repeatable; the first is the default for /ask "
+                             "(default: every model on the merged index)")
+    parser.add_argument("--index-path", help="override the models' FAISS index")
+    parser.add_argument("--k", type=int, help="chunks retrieved per question (default: the largest model k)")
+    parser.add_argument("--window-ms", type=float, default=SERVE_WINDOW_MS,
+                        help="how long a micro-batch waits for more questions")
+    parser.add_argument("--max-batch", type=int, default=SERVE_MAX_BATCH, help="questions per micro-batch")
+    parser.add_argument("--llm-workers", type=int, default=SERVE_LLM_WORKERS, help="model calls in flight")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    service = load_service(args.models, args.index_path, args.k, args.window_ms / 1000, args.max_batch,
+                           args.llm_workers)
+    print(f"Serving {', '.join(service.models)} with {service.retriever.vector_db.index.ntotal} vectors "
+          f"on http://{args.host}:{args.port}")
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO)
+    web.run_app(make_app(service), host=args.host, port=args.port, print=None,
+                access_log=access_logger if args.verbose else None)
@@ -0,0 +1,124 @@
+import os
+import re
+import json
+from typing import List, Dict, Optional, Sequence
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+from .docstore import INDEX_FILE, MMAP_FLAGS
+from .retrieval import BatchRetriever, docs_at, embed_questions
+from .telemetry import span
+
+SHARDS_DIR = "shards"
+SHARD_KEY = "source_type"
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_") or "unknown"
+
+
+class ShardSet:
+    """One flat FAISS index per `source_type`, each with a map back to global FAISS positions."""
+
+    def __init__(self, shards: Dict[str, faiss.Index], positions: Dict[str, np.ndarray], metric: int):
+        self.shards = shards
+        self.positions = positions
+        self.metric = metric
+
+    @classmethod
+    def build(cls, vector_db, index_path: str) -> "ShardSet":
+        flat = faiss.read_index(os.path.join(index_path, INDEX_FILE), MMAP_FLAGS)
+        groups: Dict[str, List[int]] = {}
+        for pos in range(flat.ntotal):
+            docs = docs_at(vector_db, [pos])
+            source_type = docs[0].metadata.get(SHARD_KEY, "unknown") if docs else "unknown"
+            groups.setdefault(source_type, []).append(pos)
+
+        shards, positions = {}, {}
+        for source_type, group in groups.items():
+            shard = faiss.IndexFlat(flat.d, flat.metric_type)
+            shard.add(np.vstack([flat.reconstruct(pos) for pos in group]))
+            shards[source_type] = shard
+            positions[source_type] = np.asarray(group, dtype=np.int64)
+        return cls(shards, positions, flat.metric_type)
+
+    def save(self, path: str, flat_mtime: float):
+        os.makedirs(path, exist_ok=True)
+        names = {}
+        for source_type, shard in self.shards.items():
+            slug = _slug(source_type)
+            faiss.write_index(shard, os.path.join(path, f"{slug}.faiss"))
+            np.save(os.path.join(path, f"{slug}.positions.npy"), self.positions[source_type])
+            names[source_type] = slug
+        with open(os.path.join(path, "shards.json"), 'w', encoding='utf-8') as f:
+            json.dump({"flat_mtime": flat_mtime, "metric": self.metric, "shards": names}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str, flat_mtime: float) -> Optional["ShardSet"]:
+        meta_path = os.path.join(path, "shards.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta["flat_mtime"] != flat_mtime:
+            return None
+        shards = {name: faiss.read_index(os.path.join(path, f"{slug}.faiss"), MMAP_FLAGS)
+                  for name, slug in meta["shards"].items()}
+        positions = {name: np.load(os.path.join(path, f"{slug}.positions.npy"))
+                     for name, slug in meta["shards"].items()}
+        return cls(shards, positions, meta["metric"])
+
+    def search(self, vectors: np.ndarray, k: int, source_types: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Global positions of the k best matches per query row, searching only the selected shards."""
+        names = [name for name in (source_types or self.shards) if name in self.shards]
+        if not names:
+            raise ValueError(f"No shard for {list(source_types)}; available: {sorted(self.shards)}")
+        all_scores, all_positions = [], []
+        for name in names:
+            scores, local = self.shards[name].search(vectors, min(k, self.shards[name].ntotal))
+            all_scores.append(scores)
+            all_positions.append(np.where(local >= 0, self.positions[name][np.maximum(local, 0)], -1))
+        scores = np.hstack(all_scores)
+        positions = np.hstack(all_positions)
+        # L2 distances rank ascending, inner products descending.
+        order = np.argsort(-scores if self.metric == faiss.METRIC_INNER_PRODUCT else scores, axis=1)[:, :k]
+        return np.take_along_axis(positions, order, axis=1)
+
+
+def load_or_build_shards(vector_db, index_path) -> ShardSet:
+    """Per-collection shards stored next to the FAISS index; rebuilt whenever index.faiss is rewritten."""
+    index_path = str(index_path)
+    shards_path = os.path.join(index_path, SHARDS_DIR)
+    flat_mtime = os.path.getmtime(os.path.join(index_path, INDEX_FILE))
+    shard_set = ShardSet.load(shards_path, flat_mtime)
+    if shard_set is None:
+        print(f"Building per-{SHARD_KEY} shards for {index_path}...")
+        shard_set = ShardSet.build(vector_db, index_path)
+        shard_set.save(shards_path, flat_mtime)
+    return shard_set
+
+
+class ShardedRetriever(BatchRetriever):
+    """Dense retriever over per-collection shards, restricted to `source_types` (all shards when None)."""
+
+    def __init__(self, vector_db, index_path, k: int = 5, source_types: Optional[Sequence[str]] = None):
+        super().__init__(vector_db, k)
+        self.shard_set = load_or_build_shards(vector_db, index_path)
+        self.source_types = source_types
+
+    def retrieve_batch(self, questions: List[str], source_types: Optional[Sequence[str]] = None) -> List[List[Document]]:
+        if not questions:
+            return []
+        vectors = embed_questions(self.vector_db, questions)
+        with span("search"):
+            positions = self.shard_set.search(vectors, self.k, source_types or self.source_types)
+        return [docs_at(self.vector_db, row) for row in positions]
+
+    def invoke(self, question: str, source_types: Optional[Sequence[str]] = None) -> List[Document]:
+        if source_types is not None:
+            return self.retrieve_batch([question], source_types)[0]
+        return super().invoke(question)
+
+    get_relevant_documents = invoke
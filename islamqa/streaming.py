@@ -0,0 +1,201 @@
+import os
+import re
+import json
+import time
+import atexit
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+STREAM = os.getenv("LLM_STREAM", "0") == "1"
+STREAM_METRICS_PATH = os.getenv("STREAM_METRICS_PATH")
+
+# The fixed refusal the RAG prompts ask for; once it has been emitted nothing useful follows.
+REFUSAL = "I’m sorry, I cannot answer this question based on the provided Islamic sources."
+STOP_SENTENCES = (REFUSAL,)
+
+_APOSTROPHES = re.compile(r"[‘’`´]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", _APOSTROPHES.sub("'", text)).lower()
+
+
+def _visible(text: str) -> str:
+    """The answer part of `text`, leaving out <think> reasoning (empty while a think block is still open)."""
+    if "<think>" not in text:
+        return text
+    return text.split("</think>", 1)[1] if "</think>" in text else ""
+
+
+class _StopScanner:
+    """Finds a stop sentence in the visible part of a streamed answer, one chunk at a time.
+
+    Each chunk is normalized on its own and only the chunk plus the last few
+    characters before it are searched, so the work per chunk does not grow
+    with the answer. Matches what searching _normalize(_visible(text)) finds.
+    """
+
+    def __init__(self, stops: Sequence[str]):
+        self.stops = stops
+        self.keep = max(1, max(len(stop) for stop in stops) - 1)
+        self.raw = ""
+        self.state = "answer"  # "thinking" inside <think>, "done" once it has closed
+        self.tail = ""
+
+    def feed(self, chunk: str) -> bool:
+        window = self.raw + chunk
+        self.raw = window[-(len("</think>") - 1):]
+        new = chunk
+        if self.state == "answer" and "<think>" in window:
+            # Like _visible: once a think block opens, nothing before it is the answer.
+            self.state, self.tail = "thinking", ""
+            window = window.split("<think>", 1)[1]
+        if self.state == "thinking":
+            if "</think>" not in window:
+                return False
+            self.state = "done"
+            new = window.split("</think>", 1)[1]
+        text = _normalize(new)
+        if self.tail.endswith(" ") and text.startswith(" "):
+            text = text[1:]
+        text = self.tail + text
+        self.tail = text[-self.keep:]
+        return any(stop in text for stop in self.stops)
+
+
+class StreamMetrics:
+    """Per-request time to first token and inter-token latency of streamed responses.
+
+    Chunks are timed as they arrive. Chat-completion APIs send about one token
+    per chunk; Gemini sends several, so its inter-token figures are per chunk.
+    """
+
+    def __init__(self, path: Optional[str] = STREAM_METRICS_PATH):
+        self.path = path
+        self.records: List[Dict[str, Any]] = []
+        self.lock = threading.Lock()
+
+    def record(self, label: str, start: float, arrivals: List[float], cancelled: bool):
+        gaps = np.diff(arrivals) * 1000 if len(arrivals) > 1 else np.zeros(0)
+        record = {
+            "model": label,
+            "ttft_ms": (arrivals[0] - start) * 1000 if arrivals else None,
+            "itl_mean_ms": float(gaps.mean()) if len(gaps) else None,
+            "itl_p99_ms": float(np.percentile(gaps, 99)) if len(gaps) else None,
+            "total_ms": ((arrivals[-1] if arrivals else time.perf_counter()) - start) * 1000,
+            "chunks": len(arrivals),
+            "cancelled": cancelled,
+        }
+        with self.lock:
+            self.records.append(record)
+            if self.path:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + "\n")
+
+    def summary(self) -> Dict[str, Any]:
+        with self.lock:
+            records = list(self.records)
+        ttfts = [r["ttft_ms"] for r in records if r["ttft_ms"] is not None]
+        itls = [r["itl_mean_ms"] for r in records if r["itl_mean_ms"] is not None]
+        return {
+            "requests": len(records),
+            "cancelled": sum(r["cancelled"] for r in records),
+            "ttft_p50_ms": float(np.percentile(ttfts, 50)) if ttfts else None,
+            "ttft_p95_ms": float(np.percentile(ttfts, 95)) if ttfts else None,
+            "itl_mean_ms": float(np.mean(itls)) if itls else None,
+        }
+
+    def print_summary(self):
+        s = self.summary()
+        if s["requests"] and s["ttft_p50_ms"] is not None:
+            itl = f"{s['itl_mean_ms']:.1f}" if s["itl_mean_ms"] is not None else "-"
+            print(f"Streaming: {s['requests']} requests, TTFT p50 {s['ttft_p50_ms']:.0f} ms / "
+                  f"p95 {s['ttft_p95_ms']:.0f} ms, inter-token {itl} ms, {s['cancelled']} stopped early")
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> StreamMetrics:
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = StreamMetrics()
+            atexit.register(_metrics.print_summary)
+    return _metrics
+
+
+def collect_stream(chunks: Iterable[str], label: str = "", stop_on: Sequence[str] = STOP_SENTENCES,
+                   close: Optional[Callable[[], None]] = None,
+                   on_token: Optional[Callable[[str], None]] = None, start: Optional[float] = None) -> str:
+    """Join a stream of text chunks, timing each one.
+
+    `start` is when the request was sent (perf_counter); SDKs return the
+    stream only after the response starts, and Gemini's after its first chunk,
+    so timing from here would miss most of the time to first token. Stops
+    reading (and calls `close` to drop the connection) as soon as the answer
+    contains one of the `stop_on` sentences.
+    """
+    stops = [_normalize(s) for s in stop_on if s]
+    scanner = _StopScanner(stops) if stops else None
+    start = time.perf_counter() if start is None else start
+    arrivals, parts, cancelled = [], [], False
+    try:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            arrivals.append(time.perf_counter())
+            parts.append(chunk)
+            if on_token is not None:
+                on_token(chunk)
+            if scanner is not None and scanner.feed(chunk):
+                cancelled = True
+                break
+    finally:
+        if cancelled and close is not None:
+            close()
+        get_metrics().record(label, start, arrivals, cancelled)
+    return "".join(parts).strip()
+
+
+def openai_chunks(response) -> Iterator[str]:
+    for chunk in response:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+def gemini_chunks(response) -> Iterator[str]:
+    for chunk in response:
+        try:
+            yield chunk.text
+        except ValueError:
+            # A chunk without text parts (e.g. only finish metadata).
+            continue
+
+
+def chat_completion(client, stream: bool = STREAM, stop_on: Sequence[str] = STOP_SENTENCES,
+                    on_token: Optional[Callable[[str], None]] = None, **kwargs) -> str:
+    """`client.chat.completions.create` for OpenAI-compatible clients (OpenAI, Groq), returning the answer text.
+
+    With `on_token` the response is always streamed and every chunk is passed to it as it arrives.
+    """
+    if not stream and on_token is None:
+        response = client.chat.completions.create(stream=False, **kwargs)
+        return response.choices[0].message.content.strip()
+    start = time.perf_counter()
+    response = client.chat.completions.create(stream=True, **kwargs)
+    return collect_stream(openai_chunks(response), kwargs.get("model", ""), stop_on, close=response.close,
+                          on_token=on_token, start=start)
+
+
+def gemini_generate(model, contents, stream: bool = STREAM, stop_on: Sequence[str] = STOP_SENTENCES,
+                    on_token: Optional[Callable[[str], None]] = None, **kwargs) -> str:
+    if not stream and on_token is None:
+        return model.generate_content(contents, **kwargs).text
+    start = time.perf_counter()
+    response = model.generate_content(contents, stream=True, **kwargs)
+    return collect_stream(gemini_chunks(response), model.model_name, stop_on, on_token=on_token, start=start)
@@ -0,0 +1,231 @@
+import os
+import json
+import time
+import atexit
+import random
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Where the run's aggregates are written at exit, as JSON and in Prometheus text format.
+TELEMETRY_PATH = os.getenv("TELEMETRY_PATH")
+TELEMETRY_PROM_PATH = os.getenv("TELEMETRY_PROM_PATH")
+# One JSON line per answered question with the timing of every stage it went through.
+TRACE_PATH = os.getenv("TELEMETRY_TRACE_PATH")
+
+# Samples kept per stage for the percentiles; counts, sums and histogram buckets are exact.
+RESERVOIR_SIZE = int(os.getenv("TELEMETRY_RESERVOIR", "2048"))
+
+BUCKETS_S = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items() if value is not None))
+
+
+def _prom_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class Histogram:
+    """Running bucket counts, sum and max of one stage's durations, plus a fixed-size sample for percentiles.
+
+    Memory and export cost stay constant however long the process runs. The
+    sample is a uniform reservoir (algorithm R) over every duration seen.
+    """
+
+    def __init__(self, size: int = RESERVOIR_SIZE):
+        self.size = size
+        self.buckets = [0] * len(BUCKETS_S)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.sample: List[float] = []
+        self.rng = random.Random(0)
+
+    def add(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        i = bisect.bisect_left(BUCKETS_S, value)
+        if i < len(BUCKETS_S):
+            self.buckets[i] += 1
+        if len(self.sample) < self.size:
+            self.sample.append(value)
+        else:
+            j = self.rng.randrange(self.count)
+            if j < self.size:
+                self.sample[j] = value
+
+    def cumulative_buckets(self) -> List[int]:
+        return np.cumsum(self.buckets).tolist()
+
+    def summary(self) -> Dict[str, float]:
+        sample = np.asarray(self.sample)
+        return {
+            "count": self.count,
+            "total_s": self.sum,
+            "mean_ms": self.sum / self.count * 1000,
+            "p50_ms": float(np.percentile(sample, 50) * 1000),
+            "p95_ms": float(np.percentile(sample, 95) * 1000),
+            "p99_ms": float(np.percentile(sample, 99) * 1000),
+            "max_ms": self.max * 1000,
+        }
+
+
+class Telemetry:
+    """Stage timings, counters and per-request traces for one run.
+
+    `span(stage)` times a block into the stage's histogram and, inside
+    `trace(...)`, into that request's trace. Traces are per thread, which
+    matches run_generation running each record on its own worker thread;
+    batched work such as prefetched retrieval happens outside any trace and
+    only shows up in the histograms.
+    """
+
+    def __init__(self, trace_path: Optional[str] = TRACE_PATH):
+        self.trace_path = trace_path
+        self.durations: Dict[Labels, Histogram] = {}
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.traces = 0
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    @contextmanager
+    def span(self, stage: str, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            key = _labels(dict(labels, stage=stage))
+            with self.lock:
+                self._histogram(key).add(end - start)
+            spans = getattr(self.local, "spans", None)
+            if spans is not None:
+                spans.append({"stage": stage, **labels, "start_ms": round((start - self.local.start) * 1000, 3),
+                              "ms": round((end - start) * 1000, 3)})
+
+    @contextmanager
+    def trace(self, **attributes) -> Iterator[None]:
+        """Collect the spans of one request and write them as one trace line."""
+        self.local.spans, self.local.start = [], time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            total = time.perf_counter() - self.local.start
+            record = {**attributes, "total_ms": round(total * 1000, 3), "spans": self.local.spans}
+            if error:
+                record["error"] = error
+            self.local.spans = None
+            with self.lock:
+                self.traces += 1
+                self._histogram(_labels({"stage": "request"})).add(total)
+                if self.trace_path:
+                    with open(self.trace_path, 'a', encoding='utf-8') as f:
+                        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _histogram(self, key: Labels) -> Histogram:
+        histogram = self.durations.get(key)
+        if histogram is None:
+            histogram = self.durations[key] = Histogram()
+        return histogram
+
+    def count(self, name: str, amount: float = 1, **labels):
+        key = (name, _labels(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            stages = [{**dict(key), **histogram.summary()} for key, histogram in sorted(self.durations.items())]
+            counters = dict(self.counters)
+        return {
+            "stages": stages,
+            "counters": [{"name": name, **dict(labels), "value": value}
+                         for (name, labels), value in sorted(counters.items())],
+        }
+
+    def prometheus(self) -> str:
+        with self.lock:
+            durations = {key: (histogram.cumulative_buckets(), histogram.count, histogram.sum)
+                         for key, histogram in self.durations.items()}
+            counters = dict(self.counters)
+
+        lines = ["# HELP islamqa_stage_duration_seconds Time spent in each pipeline stage.",
+                 "# TYPE islamqa_stage_duration_seconds histogram"]
+        for key, (buckets, total, seconds) in sorted(durations.items()):
+            for bound, cumulative in zip(BUCKETS_S, buckets):
+                lines.append(f"islamqa_stage_duration_seconds_bucket{_prom_labels(key, ('le', f'{bound:g}'))} "
+                             f"{cumulative}")
+            lines.append(f"islamqa_stage_duration_seconds_bucket{_prom_labels(key, ('le', '+Inf'))} {total}")
+            lines.append(f"islamqa_stage_duration_seconds_sum{_prom_labels(key)} {seconds:.6f}")
+            lines.append(f"islamqa_stage_duration_seconds_count{_prom_labels(key)} {total}")
+
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE islamqa_{name}_total counter")
+            for (counter, labels), value in sorted(counters.items()):
+                if counter == name:
+                    lines.append(f"islamqa_{name}_total{_prom_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, json_path: Optional[str] = TELEMETRY_PATH, prom_path: Optional[str] = TELEMETRY_PROM_PATH):
+        if json_path:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f, indent=2)
+        if prom_path:
+            with open(prom_path, 'w', encoding='utf-8') as f:
+                f.write(self.prometheus())
+
+    def print_summary(self):
+        stages = [s for s in self.snapshot()["stages"] if s["count"]]
+        if not stages:
+            return
+        print(f"{'stage':<34} {'count':>6} {'total s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for s in sorted(stages, key=lambda s: -s["total_s"]):
+            name = s["stage"] + "".join(f" {k}={v}" for k, v in s.items()
+                                        if k in ("provider", "model", "retriever"))
+            print(f"{name[:34]:<34} {s['count']:>6} {s['total_s']:>9.2f} {s['p50_ms']:>9.1f} "
+                  f"{s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f}")
+
+
+_telemetry = None
+_telemetry_lock = threading.Lock()
+
+
+def _at_exit(telemetry: Telemetry):
+    telemetry.print_summary()
+    telemetry.export()
+
+
+def get_telemetry() -> Telemetry:
+    global _telemetry
+    with _telemetry_lock:
+        if _telemetry is None:
+            _telemetry = Telemetry()
+            atexit.register(_at_exit, _telemetry)
+    return _telemetry
+
+
+def span(stage: str, **labels):
+    return get_telemetry().span(stage, **labels)
+
+
+def trace(**attributes):
+    return get_telemetry().trace(**attributes)
+
+
+def count(name: str, amount: float = 1, **labels):
+    get_telemetry().count(name, amount, **labels)
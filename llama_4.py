@@ -1,63 +0,0 @@
-import json
-from groq import Groq
-from os import getenv
-from dotenv import load_dotenv
-
-
-load_dotenv()
-# Setup DeepSeek API client
-client = Groq(
-    api_key=getenv("groq"),
-)
-
-input_file = 'test.jsonl'
-output_file = 'llama-4-maverick-17b-128e-instruct.jsonl'
-
-
-results = []
-
-# Process first 100 questions
-with open(input_file, 'r', encoding='utf-8') as file:
-    for idx, line in enumerate(file):
-        if idx >= 100:
-            break
-        try:
-            data = json.loads(line)
-            question = data.get("Question") or data.get("question")
-            if not question:
-                continue
-
-            # Call DeepSeek API
-            response = client.chat.completions.create(
-                model="meta-llama/llama-4-maverick-17b-128e-instruct",
-                messages=[
-                    {"role": "user", "content": question}
-                ],
-                temperature=0.7,
-                 max_completion_tokens=512,
-                stream=False
-            )
-
-            generated_answer = response.choices[0].message.content.strip()
-
-            # Prepare output
-            output_record = {
-                "Question": data.get("Question") or data.get("question"),
-                "Answer": data.get("Answer") or data.get("answer"),
-                "Document": data.get("Document") or data.get("document"),
-                "Generated_Answer": generated_answer
-            }
-
-            results.append(output_record)
-            print(f"Processed {idx+1}/100")
-
-        except Exception as e:
-            print(f"Error at record {idx+1}: {type(e).__name__}: {e}")
-            continue
-
-# Save results to JSONL
-with open(output_file, 'w', encoding='utf-8') as out_file:
-    for item in results:
-        out_file.write(json.dumps(item, ensure_ascii=False) + '\n')
-
-print(f"\nDone! Generated answers saved to {output_file}")
@@ -0,0 +1,67 @@
+import zlib
+from typing import List
+
+import faiss
+import numpy as np
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+from islamqa.ann_index import DEFAULT_PARAMS, INDEX_TYPES, build_ann_index, load_vector_db
+from islamqa.docstore import save_vector_db
+
+
+def _flat(n: int, dim: int = 32) -> faiss.IndexFlatIP:
+    vectors = np.random.default_rng(0).standard_normal((n, dim)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    index = faiss.IndexFlatIP(dim)
+    index.add(vectors)
+    return index
+
+
+@pytest.mark.parametrize("n", [1, 10, 100, 300])
+def test_ivf_pq_builds_on_small_corpora(n):
+    flat = _flat(n)
+    params = dict(DEFAULT_PARAMS["ivf_pq"], m=8)
+    index, used = build_ann_index(flat, "ivf_pq", params)
+
+    assert index.ntotal == n
+    assert used["nbits"] <= max(0, int(np.log2(n)))
+    index.nprobe = used["nlist"]
+    _, found = index.search(flat.reconstruct_n(0, n), 1)
+    assert (found[:, 0] >= 0).all()
+
+
+def test_ivf_pq_keeps_nbits_when_corpus_is_large_enough():
+    _, used = build_ann_index(_flat(600), "ivf_pq", dict(DEFAULT_PARAMS["ivf_pq"], m=8))
+    assert used["nbits"] == 8
+
+
+class _HashEmbeddings(Embeddings):
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(32, dtype=np.float32)
+        for word in text.split():
+            vector[zlib.crc32(word.encode()) % 32] += 1
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+@pytest.mark.parametrize("index_type", INDEX_TYPES)
+def test_index_types_reload_from_disk(tmp_path, index_type):
+    embeddings = _HashEmbeddings()
+    texts = [f"chunk {i} word{i % 17} term{i % 5}" for i in range(400)]
+    save_vector_db(FAISS.from_texts(texts, embeddings), str(tmp_path))
+    params = {"m": 8} if index_type == "ivf_pq" else None
+
+    built = load_vector_db(tmp_path, embeddings, index_type, params)
+    expected = [doc.page_content for doc in built.similarity_search(texts[7], k=3)]
+    # The second load reuses the saved approximate index, read memory-mapped.
+    reloaded = load_vector_db(tmp_path, embeddings, index_type, params)
+
+    assert reloaded.index.ntotal == len(texts)
+    assert [doc.page_content for doc in reloaded.similarity_search(texts[7], k=3)] == expected
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+from aiohttp.test_utils import TestClient, TestServer
+from langchain_core.documents import Document
+
+from islamqa.server import RagService, make_app
+
+
+class _StubRetriever:
+    k = 5
+
+    def retrieve_batch(self, questions):
+        return [[Document(page_content=f"{question} {i}", metadata={"source": f"s{i}"}) for i in range(self.k)]
+                for question in questions]
+
+
+def _post(path, body):
+    async def run():
+        service = RagService(_StubRetriever(), {"stub": {"model": "stub"}})
+        async with TestClient(TestServer(make_app(service))) as client:
+            response = await client.post(path, json=body)
+            return response.status, await response.json()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("body", [
+    {"questions": "zakat"},
+    {"questions": 5},
+    {"questions": []},
+    {"questions": ["zakat", ""]},
+    {"questions": ["zakat", 3]},
+    {"question": "zakat", "k": -1},
+    {"question": "zakat", "k": 0},
+    {"question": "zakat", "k": 2.5},
+    {"question": "zakat", "k": "a"},
+])
+def test_retrieve_rejects_bad_requests(body):
+    status, data = _post("/retrieve", body)
+    assert status == 400
+    assert "error" in data
+
+
+def test_retrieve_batch_and_k():
+    status, data = _post("/retrieve", {"questions": ["zakat", "fasting"], "k": 2})
+    assert status == 200
+    assert [item["question"] for item in data] == ["zakat", "fasting"]
+    assert [len(item["documents"]) for item in data] == [2, 2]
+
+
+def test_retrieve_caps_k_at_the_index_k():
+    status, data = _post("/retrieve", {"question": "zakat", "k": 50})
+    assert status == 200
+    assert len(data["documents"]) == _StubRetriever.k
@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from islamqa.streaming import REFUSAL, _normalize, _StopScanner, _visible, collect_stream
+
+STOPS = [_normalize(REFUSAL)]
+TEXTS = [
+    f"The answer is in the hadith.  {REFUSAL} More text.",
+    REFUSAL.replace(" ", "\n ").replace("’", "'").upper(),
+    f"<think>maybe {REFUSAL}</think>Zakat is 2.5% of savings.",
+    f"<think>weighing the sources</think>\n{REFUSAL}",
+    f"Preamble {REFUSAL[:20]}<think>still thinking",
+    "Fasting is obligatory in Ramadan for adults who are able.",
+]
+
+
+def _split(text: str, rng: random.Random):
+    cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(1, 40))))
+    return [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+
+
+def _first(hits):
+    return hits.index(True) if True in hits else None
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_stop_scanner_matches_a_full_rescan(text):
+    rng = random.Random(0)
+    for _ in range(200):
+        chunks = _split(text, rng)
+        scanner = _StopScanner(STOPS)
+        found = [scanner.feed(chunk) for chunk in chunks]
+        expected = [any(stop in _normalize(_visible("".join(chunks[:i + 1]))) for stop in STOPS)
+                    for i in range(len(chunks))]
+        # collect_stream stops at the first hit; what the scanner says after that is never used.
+        assert _first(found) == _first(expected)
+
+
+def test_collect_stream_stops_after_the_refusal():
+    closed = []
+    chunks = ["Sorry. ", REFUSAL[:30], REFUSAL[30:], " and more", " text"]
+    answer = collect_stream(iter(chunks), close=lambda: closed.append(True))
+    assert answer == f"Sorry. {REFUSAL}"
+    assert closed == [True]